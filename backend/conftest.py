@@ -0,0 +1,30 @@
+import os
+import sys
+
+import django
+import pytest
+
+# Django-aware tests (e.g. serializer parity) need the project settings;
+# the app modules expect backend/ on sys.path like manage.py sets it up.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_analyzer.settings")
+django.setup()
+
+
+@pytest.fixture(scope="session")
+def api_client():
+    """
+    Django test client on a throwaway test database (pytest-django is
+    not a dependency).
+    """
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield Client()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
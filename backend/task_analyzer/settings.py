@@ -130,3 +130,68 @@ CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_HEADERS = ['*']
 CORS_ALLOW_METHODS = ['*']
 CORS_EXPOSE_HEADERS = ['*']
+
+# Task analyzer tuning
+
+# Batches with at least this many tasks are scored with the vectorized
+# NumPy path (scoring.score_batch) instead of the per-task loop
+ANALYZE_BATCH_SCORING_THRESHOLD = 500
+
+# Analysis sessions are saved with bulk_create in chunks of this size,
+# all inside one transaction
+ANALYZE_PERSIST_BATCH_SIZE = 500
+
+# Save sessions on a background writer thread instead of before the
+# response is returned (suggest sees the session once the write is done)
+ANALYZE_PERSIST_ASYNC = False
+
+# Cache alias used to share the learned-weights version counter between
+# workers. It must be a cache all workers share (Redis, Memcached, DB):
+# with None or a process-local backend such as the default LocMemCache,
+# each worker re-reads the weights from the DB every WEIGHTS_LOCAL_TTL
+# seconds instead (0 = on every request)
+WEIGHTS_CACHE_ALIAS = "default"
+WEIGHTS_CACHE_TIMEOUT = None
+WEIGHTS_LOCAL_TTL = 5
+
+# Number of top suggestions precomputed per session for /suggest/
+SUGGESTION_SNAPSHOT_SIZE = 10
+
+# Task lists with at least this many items are validated with the
+# compiled fast path (taskapp.validators) instead of TaskSerializer
+FAST_VALIDATION_THRESHOLD = 1000
+
+# Worker processes for sharded scoring of very large batches (0 = off);
+# batches with at least ANALYZE_PARALLEL_THRESHOLD tasks use the pool
+ANALYZE_PARALLEL_WORKERS = 0
+ANALYZE_PARALLEL_THRESHOLD = 50000
+
+# Feedback is appended to a log and folded into the learned weights by
+# taskapp.weights.reduce_feedback: 0 folds right after each feedback,
+# N > 0 folds in the background at most N seconds after the first new one
+FEEDBACK_FLUSH_INTERVAL = 0
+
+# Largest number of items accepted by /api/tasks/feedback/batch/
+FEEDBACK_BATCH_MAX_ITEMS = 1000
+
+# Retention (manage.py prune_sessions [--interval SECONDS]): the newest
+# SESSION_RETENTION_KEEP sessions keep their task rows; older ones are
+# rolled up into their AnalysisSession row, and those summaries are
+# dropped after SESSION_RETENTION_MAX_AGE_DAYS (None = keep forever).
+# Deletes run SESSION_RETENTION_CHUNK_SIZE rows per transaction.
+SESSION_RETENTION_KEEP = 20
+SESSION_RETENTION_MAX_AGE_DAYS = None
+SESSION_RETENTION_CHUNK_SIZE = 500
+SESSION_RETENTION_PAUSE = 0.0
+
+# Per-process memo of scoring results keyed by each task's scoring inputs
+# (due date, importance, hours, dependents, today, weights): at most
+# SCORE_MEMO_SIZE entries (0 disables it), each kept SCORE_MEMO_TTL seconds.
+# Only batches scored per task (below ANALYZE_BATCH_SCORING_THRESHOLD) use it
+SCORE_MEMO_SIZE = 100000
+SCORE_MEMO_TTL = 3600
+
+# Per-stage request timing (taskapp.instrumentation): Server-Timing
+# header, a "taskapp.timing" log record per request and histograms at
+# /api/tasks/metrics/ (local requests only). Off by default.
+REQUEST_TIMING_ENABLED = False
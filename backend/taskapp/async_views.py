@@ -0,0 +1,235 @@
+"""
+Native async variants of the analyze, suggest and feedback endpoints
+for ASGI deployments, served under /api/tasks/async/.
+
+Same request and response bodies as the DRF views in views.py. ORM
+access goes through the async ORM, and validation / scoring run in a
+thread pool, so the event loop keeps serving suggest / feedback while
+a large analyze batch is being scored.
+"""
+
+from functools import wraps
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings as django_settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import AnalysisSession, AnalyzedTask, Feedback
+from .persistence import asave_session, asuggestions_from_rows, save_session_async
+from .views import (
+    STATIC_STRATEGIES,
+    WEIGHT_PROFILES,
+    _cycle_payload,
+    _dependency_mode,
+    _etag_matches,
+    _feedback_result,
+    _non_negative_int,
+    _order_options,
+    _score_and_rank,
+    _score_graph,
+    _snapshot_covers,
+    _suggest_etag,
+    _today,
+    _validate_tasks,
+)
+from .weights import get_weights, request_flush
+
+from scoring import build_dependency_graph, find_cycles
+
+
+def _json(data, status=200, headers=None):
+    return JsonResponse(data, encoder=JSONEncoder, status=status, headers=headers, safe=False)
+
+
+def _async_api(methods):
+    """
+    Async counterpart of @api_view: CSRF exempt, restricted to `methods`,
+    and DRF ValidationError / ParseError rendered the way DRF renders them.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                return await view(request, *args, **kwargs)
+            except (ValidationError, ParseError) as exc:
+                detail = exc.detail
+                if not isinstance(detail, (dict, list)):
+                    detail = {"detail": detail}
+                return _json(detail, status=exc.status_code)
+
+        return csrf_exempt(require_http_methods(methods)(wrapper))
+
+    return decorator
+
+
+def _json_body(request):
+    if not request.body:
+        return {}
+    try:
+        data = json.loads(request.body)
+    except ValueError as exc:
+        raise ParseError(f"JSON parse error - {exc}")
+    if not isinstance(data, dict):
+        raise ParseError("Expected a JSON object.")
+    return data
+
+
+def _analyze_batch(tasks_data, today, weights, limit, offset, dependency_mode="direct",
+                   order="score", capacity_hours=None):
+    """
+    CPU-bound part of analyze: validate, build the graph, check cycles,
+    score and rank. Returns (dep_graph, cycles, scored_tasks, ranked_tasks).
+    """
+    validated_tasks = _validate_tasks(tasks_data)
+
+    dep_graph = build_dependency_graph(validated_tasks)
+    cycles = find_cycles(dep_graph)
+    if cycles:
+        return dep_graph, cycles, None, None
+
+    scored_tasks, ranked_tasks = _score_and_rank(
+        validated_tasks,
+        today,
+        _score_graph(dep_graph, dependency_mode, validated_tasks),
+        weights,
+        limit,
+        offset,
+        order,
+        capacity_hours
+    )
+    return dep_graph, cycles, scored_tasks, ranked_tasks
+
+
+# ANALYZE ENDPOINT
+
+
+@_async_api(["POST"])
+async def analyze_async(request):
+    """
+    Async analyze: validation and scoring run in a worker thread, the
+    session is written with abulk_create.
+    """
+    data = _json_body(request)
+
+    limit = _non_negative_int(data.get("limit"), "limit")
+    offset = _non_negative_int(data.get("offset"), "offset", default=0)
+    dependency_mode = _dependency_mode(data.get("dependency_mode"))
+    order, capacity_hours = _order_options(data)
+
+    strategy = (data.get("strategy") or "smart").lower()
+    if strategy in STATIC_STRATEGIES:
+        weights = WEIGHT_PROFILES[strategy]
+    else:
+        weights = await sync_to_async(get_weights)()
+
+    today = _today(data.get("today"))
+
+    dep_graph, cycles, scored_tasks, ranked_tasks = await sync_to_async(
+        _analyze_batch, thread_sensitive=False
+    )(
+        data.get("tasks", []), today, weights, limit, offset,
+        dependency_mode, order, capacity_hours
+    )
+    if cycles:
+        return _json(_cycle_payload(dep_graph, cycles), status=400)
+
+    session_id = uuid.uuid4()
+
+    options = {
+        "strategy": strategy,
+        "today": today,
+        "weights": weights,
+        "batch_size": getattr(django_settings, "ANALYZE_PERSIST_BATCH_SIZE", 500),
+        "snapshot_size": getattr(django_settings, "SUGGESTION_SNAPSHOT_SIZE", 10),
+        "dependency_mode": dependency_mode,
+    }
+    if getattr(django_settings, "ANALYZE_PERSIST_ASYNC", False):
+        save_session_async(session_id, scored_tasks, **options)
+    else:
+        await asave_session(session_id, scored_tasks, **options)
+
+    return _json({
+        "session_id": session_id,
+        "total": len(scored_tasks),
+        "tasks": [task.to_dict() for task in ranked_tasks]
+    })
+
+
+# SUGGEST ENDPOINT
+
+
+@_async_api(["GET"])
+async def suggest_async(request):
+    """
+    Async suggest: one afirst() for the newest session, served from its
+    snapshot (or the score index when the snapshot is too short).
+    """
+    limit = _non_negative_int(request.GET.get("limit"), "limit", default=3)
+
+    latest_session = await AnalysisSession.objects.order_by('-created_at').afirst()
+    if not latest_session:
+        return _json(
+            {"error": "No analyzed tasks found. Run /api/tasks/analyze/ first."},
+            status=400
+        )
+
+    etag = _suggest_etag(latest_session, limit)
+    if _etag_matches(request, etag):
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    if _snapshot_covers(latest_session, limit):
+        suggestions = latest_session.suggestions[:limit]
+    else:
+        suggestions = await asuggestions_from_rows(
+            latest_session.session_id, limit, latest_session.dependency_mode
+        )
+
+    response = _json({
+        "session_id": str(latest_session.session_id),
+        "suggestions": suggestions
+    })
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+# FEEDBACK ENDPOINT
+
+
+@_async_api(["POST"])
+async def feedback_async(request):
+    """
+    Async feedback: same log-and-fold as submit_feedback, the lookup
+    and the log insert through afirst / acreate.
+    """
+    data = _json_body(request)
+
+    task_id = data.get("task_id")
+    was_helpful = data.get("was_helpful")
+
+    if task_id is None or was_helpful is None:
+        return _json({"error": "task_id and was_helpful are required"}, status=400)
+
+    analyzed = await AnalyzedTask.objects.filter(task_id=task_id).order_by('-created_at').afirst()
+    if not analyzed:
+        return _json({"error": "Task not found in analysis history"}, status=404)
+
+    await Feedback.objects.acreate(
+        task_id=task_id,
+        was_helpful=bool(was_helpful),
+        urgency=analyzed.urgency,
+        importance=analyzed.importance,
+        effort=analyzed.effort,
+        dependency=analyzed.dependency
+    )
+
+    weights = await sync_to_async(request_flush)()
+    return _json(await sync_to_async(_feedback_result)(weights))
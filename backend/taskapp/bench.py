@@ -0,0 +1,116 @@
+"""
+Benchmark helpers for manage.py bench: synthetic backlogs and timers.
+"""
+
+from datetime import date, timedelta
+import random
+import statistics
+import time
+
+from scoring import (
+    UrgencyTable,
+    build_dependency_graph,
+    compute_final_score,
+    count_working_days,
+    detect_cycle,
+)
+
+
+BENCH_TODAY = date(2024, 1, 1)
+BENCH_WEIGHTS = {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1}
+
+
+def make_backlog(size, density=1.0, horizon=60, seed=0):
+    """
+    `size` valid tasks in API format. Each task depends on about
+    `density` earlier tasks (so the graph is acyclic), and due dates
+    spread over -horizon/4 … horizon days around BENCH_TODAY.
+    """
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(size):
+        n_deps = min(i, int(density) + (rng.random() < density % 1))
+        due = BENCH_TODAY + timedelta(days=rng.randint(-horizon // 4, horizon))
+        tasks.append({
+            "id": str(i),
+            "title": f"Task {i}",
+            "due_date": due.isoformat(),
+            "estimated_hours": rng.randint(0, 12),
+            "importance": rng.randint(1, 10),
+            "dependencies": [str(d) for d in rng.sample(range(i), n_deps)],
+        })
+    return tasks
+
+
+def time_call(fn, repeat):
+    """
+    Run fn `repeat` times; timings in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        fn()
+        timings.append((time.perf_counter_ns() - start) / 1e6)
+
+    return {
+        "repeat": repeat,
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+        "max_ms": max(timings),
+    }
+
+
+def scoring_benchmarks(tasks):
+    """
+    (name, callable) pairs timing the scoring engine on one backlog.
+    """
+    parsed = [
+        dict(task, due_date=date.fromisoformat(task["due_date"]))
+        for task in tasks
+    ]
+    graph = build_dependency_graph(parsed)
+
+    def working_days():
+        for task in parsed:
+            count_working_days(BENCH_TODAY, task["due_date"])
+
+    def final_scores():
+        for task in parsed:
+            compute_final_score(task, BENCH_TODAY, graph, BENCH_WEIGHTS)
+
+    def final_scores_table():
+        urgency = UrgencyTable(BENCH_TODAY)
+        for task in parsed:
+            compute_final_score(task, BENCH_TODAY, graph, BENCH_WEIGHTS, urgency)
+
+    return [
+        ("count_working_days", working_days),
+        ("build_dependency_graph", lambda: build_dependency_graph(parsed)),
+        ("detect_cycle", lambda: detect_cycle(graph)),
+        ("compute_final_score", final_scores),
+        ("compute_final_score_table", final_scores_table),
+    ]
+
+
+def api_benchmarks(client, tasks, before=None):
+    """
+    (name, callable) pairs timing analyze / suggest round trips through
+    a Django test client. `before` runs ahead of each analyze call.
+    """
+    body = {"tasks": tasks, "today": BENCH_TODAY.isoformat(), "strategy": "smart"}
+
+    def analyze():
+        if before:
+            before()
+        response = client.post("/api/tasks/analyze/", body, content_type="application/json")
+        assert response.status_code == 200, response.content[:200]
+
+    def suggest():
+        response = client.get("/api/tasks/suggest/")
+        assert response.status_code == 200, response.content[:200]
+
+    return [
+        ("api_analyze", analyze),
+        ("api_suggest", suggest),
+    ]
@@ -0,0 +1,180 @@
+"""
+Per-stage request timing: perf_counter_ns per pipeline stage plus ORM
+query counts, reported as a Server-Timing header, a structured log record
+and in-process histograms (served by the metrics view).
+
+Off by default: unless REQUEST_TIMING_ENABLED is set, `stage()` is a
+shared no-op context manager and `timed` calls the view straight through.
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger("taskapp.timing")
+
+_current = ContextVar("taskapp_request_timer", default=None)
+_NULL_STAGE = nullcontext()
+
+# Histogram bucket upper bounds (+Inf bucket implied): durations in
+# milliseconds, ORM queries per request
+BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BUCKETS_QUERIES = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def timing_enabled():
+    return getattr(settings, "REQUEST_TIMING_ENABLED", False)
+
+
+class RequestTimer:
+    """
+    Stage durations (ns) and ORM query counts of one request.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter_ns()
+        self.total_ns = None
+        self.stages = {}
+        self.queries = 0
+        self._active = []
+
+    @contextmanager
+    def stage(self, name):
+        self._active.append(name)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0) + time.perf_counter_ns() - start
+            self._active.pop()
+
+    def count_query(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def finish(self):
+        self.total_ns = time.perf_counter_ns() - self.started
+
+    def server_timing(self):
+        parts = [f"{name};dur={ns / 1e6:.3f}" for name, ns in self.stages.items()]
+        parts.append(f'db;desc="{self.queries} queries"')
+        parts.append(f"total;dur={self.total_ns / 1e6:.3f}")
+        return ", ".join(parts)
+
+    def record(self, status=None):
+        return {
+            "endpoint": self.endpoint,
+            "status": status,
+            "total_ms": round(self.total_ns / 1e6, 3),
+            "stages_ms": {name: round(ns / 1e6, 3) for name, ns in self.stages.items()},
+            "queries": self.queries,
+        }
+
+
+def stage(name):
+    """
+    Time the enclosed block as stage `name` of the current request
+    (no-op when timing is off or outside a timed view).
+    """
+    timer = _current.get()
+    if timer is None:
+        return _NULL_STAGE
+    return timer.stage(name)
+
+
+def _observe(endpoint, name, value, buckets=BUCKETS_MS):
+    key = (endpoint, name)
+    with _histograms_lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {
+                "buckets": buckets,
+                "counts": [0] * (len(buckets) + 1),
+                "sum": 0.0,
+                "count": 0
+            }
+        hist["counts"][bisect_left(buckets, value)] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+
+def _record(timer, response):
+    timer.finish()
+    record = timer.record(getattr(response, "status_code", None))
+
+    for name, ms in record["stages_ms"].items():
+        _observe(timer.endpoint, name, ms)
+    _observe(timer.endpoint, "total", record["total_ms"])
+    _observe(timer.endpoint, "queries", record["queries"], BUCKETS_QUERIES)
+
+    response["Server-Timing"] = timer.server_timing()
+    logger.info(json.dumps(record), extra={"timing": record})
+
+
+def timed(endpoint):
+    """
+    View decorator: time the request and its stages under `endpoint`.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not timing_enabled():
+                return view(request, *args, **kwargs)
+
+            timer = RequestTimer(endpoint)
+            token = _current.set(timer)
+            try:
+                with connection.execute_wrapper(timer.count_query):
+                    response = view(request, *args, **kwargs)
+            finally:
+                _current.reset(token)
+
+            _record(timer, response)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def metrics():
+    """
+    Aggregated histograms per endpoint and stage: cumulative counts per
+    bucket upper bound ("le"), plus count and sum. Durations are in ms,
+    "queries" counts ORM queries per request.
+    """
+    with _histograms_lock:
+        snapshot = {key: dict(hist, counts=list(hist["counts"])) for key, hist in _histograms.items()}
+
+    result = {}
+    for (endpoint, name), hist in sorted(snapshot.items()):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(hist["buckets"] + ("+Inf",), hist["counts"]):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        result.setdefault(endpoint, {})[name] = {
+            "count": hist["count"],
+            "sum": round(hist["sum"], 3),
+            "buckets": buckets,
+        }
+    return result
+
+
+def reset_metrics():
+    with _histograms_lock:
+        _histograms.clear()
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+import json
+import platform
+import subprocess
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from taskapp import views
+from taskapp.bench import api_benchmarks, make_backlog, scoring_benchmarks, time_call
+
+
+def _sizes(value):
+    return [int(size) for size in value.split(",") if size]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the scoring engine and the analyze / suggest endpoints on "
+        "synthetic backlogs and write the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=_sizes, default=[100, 1000, 10000],
+            help="Comma separated backlog sizes (default 100,1000,10000)."
+        )
+        parser.add_argument(
+            "--density", type=float, default=1.0,
+            help="Average number of dependencies per task."
+        )
+        parser.add_argument(
+            "--horizon", type=int, default=60,
+            help="Due dates spread over this many days."
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--no-api", action="store_true",
+            help="Only time the scoring engine (no test database)."
+        )
+        parser.add_argument(
+            "--output", default=None,
+            help="Write the JSON results to this file instead of stdout."
+        )
+
+    def handle(self, *args, **options):
+        results = []
+
+        if not options["no_api"]:
+            # API round trips run against a throwaway test database
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            client = Client()
+
+        try:
+            for size in options["sizes"]:
+                tasks = make_backlog(
+                    size, options["density"], options["horizon"], options["seed"]
+                )
+
+                benchmarks = scoring_benchmarks(tasks)
+                if not options["no_api"]:
+                    # cold scoring on every analyze call
+                    before = views.score_memo.clear if views.score_memo else None
+                    benchmarks += api_benchmarks(client, tasks, before)
+
+                for name, fn in benchmarks:
+                    timing = time_call(fn, options["repeat"])
+                    results.append({"benchmark": name, "size": size, **timing})
+                    self.stderr.write(f"{name:<24} n={size:<7} median {timing['median_ms']:.2f} ms")
+        finally:
+            if not options["no_api"]:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "density": options["density"],
+                "horizon": options["horizon"],
+                "repeat": options["repeat"],
+                "seed": options["seed"],
+            },
+            "results": results,
+        }
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from taskapp.retention import apply_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Keep the latest N analysis sessions hot, roll older ones up into "
+        "their AnalysisSession row and delete their task rows in chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep", type=int,
+            default=getattr(settings, "SESSION_RETENTION_KEEP", 20),
+            help="Number of newest sessions whose task rows are kept."
+        )
+        parser.add_argument(
+            "--max-age-days", type=int,
+            default=getattr(settings, "SESSION_RETENTION_MAX_AGE_DAYS", None),
+            help="Also drop archived session summaries older than this."
+        )
+        parser.add_argument(
+            "--chunk-size", type=int,
+            default=getattr(settings, "SESSION_RETENTION_CHUNK_SIZE", 500),
+            help="Rows deleted per transaction."
+        )
+        parser.add_argument(
+            "--pause", type=float,
+            default=getattr(settings, "SESSION_RETENTION_PAUSE", 0.0),
+            help="Seconds to sleep between delete chunks."
+        )
+        parser.add_argument(
+            "--interval", type=float, default=None,
+            help="Run periodically every INTERVAL seconds instead of once."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = apply_retention(
+                options["keep"],
+                max_age_days=options["max_age_days"],
+                chunk_size=options["chunk_size"],
+                pause=options["pause"]
+            )
+            self.stdout.write(
+                "Archived {archived_sessions} sessions, deleted {deleted_rows} "
+                "task rows, purged {purged_sessions} old summaries.".format(**result)
+            )
+
+            if options["interval"] is None:
+                return
+
+            connection.close()
+            time.sleep(options["interval"])
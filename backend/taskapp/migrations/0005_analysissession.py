@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:58
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_sessions(apps, schema_editor):
+    AnalyzedTask = apps.get_model("taskapp", "AnalyzedTask")
+    AnalysisSession = apps.get_model("taskapp", "AnalysisSession")
+
+    sessions = (
+        AnalyzedTask.objects.order_by()
+        .values("session_id")
+        .annotate(latest=Max("created_at"), rows=Count("id"))
+    )
+    AnalysisSession.objects.bulk_create(
+        [
+            AnalysisSession(
+                session_id=row["session_id"],
+                created_at=row["latest"],
+                task_count=row["rows"],
+            )
+            for row in sessions
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskapp", "0004_feedback_globalsettings_delete_learnedweights"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisSession",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("session_id", models.UUIDField(unique=True)),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("strategy", models.CharField(blank=True, max_length=20)),
+                ("task_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="analyzedtask",
+            index=models.Index(
+                fields=["session_id", "-score"], name="analyzedtask_session_score"
+            ),
+        ),
+        migrations.RunPython(backfill_sessions, migrations.RunPython.noop),
+    ]
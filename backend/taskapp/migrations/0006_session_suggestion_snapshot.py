@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:59
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskapp", "0005_analysissession"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysissession",
+            name="etag",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="analysissession",
+            name="suggestions",
+            field=models.JSONField(
+                default=list, encoder=django.core.serializers.json.DjangoJSONEncoder
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskapp", "0006_session_suggestion_snapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysissession",
+            name="today",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="analysissession",
+            name="weights",
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name="analyzedtask",
+            name="dependencies",
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name="analyzedtask",
+            name="estimated_hours",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="analyzedtask",
+            name="importance_rating",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
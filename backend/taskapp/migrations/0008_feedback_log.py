@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:11
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def skip_applied_feedback(apps, schema_editor):
+    # feedback logged before this migration is already in the weights
+    Feedback = apps.get_model("taskapp", "Feedback")
+    GlobalSettings = apps.get_model("taskapp", "GlobalSettings")
+
+    last_id = Feedback.objects.aggregate(last=Max("id"))["last"] or 0
+    GlobalSettings.objects.update(feedback_cursor=last_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskapp", "0007_incremental_reanalysis"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="globalsettings",
+            name="feedback_cursor",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(skip_applied_feedback, migrations.RunPython.noop),
+    ]
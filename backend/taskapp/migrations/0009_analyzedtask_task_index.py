@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskapp", "0008_feedback_log"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="analyzedtask",
+            index=models.Index(
+                fields=["task_id", "-created_at"], name="analyzedtask_task_latest"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskapp", "0009_analyzedtask_task_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysissession",
+            name="archived_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="analysissession",
+            name="avg_score",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="analysissession",
+            name="max_score",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskapp", "0010_session_retention"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysissession",
+            name="dependency_mode",
+            field=models.CharField(default="direct", max_length=20),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:21
+
+from django.db import migrations, models
+
+
+def backfill_edges(apps, schema_editor):
+    # edges of the sessions saved so far, from their tasks' dependency lists
+    AnalyzedTask = apps.get_model("taskapp", "AnalyzedTask")
+    TaskEdge = apps.get_model("taskapp", "TaskEdge")
+
+    rows = (
+        AnalyzedTask.objects.exclude(dependencies=[])
+        .order_by("pk")
+        .values_list("session_id", "task_id", "dependencies")
+    )
+    edges = []
+    for session_id, task_id, dependencies in rows.iterator():
+        edges.extend(
+            TaskEdge(session_id=session_id, source=task_id, target=dep)
+            for dep in dependencies
+        )
+        if len(edges) >= 1000:
+            TaskEdge.objects.bulk_create(edges)
+            edges = []
+    TaskEdge.objects.bulk_create(edges)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskapp", "0011_session_dependency_mode"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskEdge",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("session_id", models.UUIDField()),
+                ("source", models.CharField(max_length=100)),
+                ("target", models.CharField(max_length=100)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["session_id", "source"], name="taskedge_session_source"
+                    ),
+                    models.Index(
+                        fields=["session_id", "target"], name="taskedge_session_target"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_edges, migrations.RunPython.noop),
+    ]
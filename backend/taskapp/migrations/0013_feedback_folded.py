@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:38
+
+from django.db import migrations, models
+
+
+def mark_folded_feedback(apps, schema_editor):
+    # rows up to the old cursor (now the version's start value) are in
+    # the weights already
+    Feedback = apps.get_model("taskapp", "Feedback")
+    GlobalSettings = apps.get_model("taskapp", "GlobalSettings")
+
+    cursor = GlobalSettings.objects.values_list("weights_version", flat=True).first() or 0
+    Feedback.objects.filter(id__lte=cursor).update(folded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskapp", "0012_task_edges"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="globalsettings",
+            old_name="feedback_cursor",
+            new_name="weights_version",
+        ),
+        migrations.AddField(
+            model_name="feedback",
+            name="folded",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_folded_feedback, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="feedback",
+            index=models.Index(
+                condition=models.Q(("folded", False)),
+                fields=["id"],
+                name="feedback_pending",
+            ),
+        ),
+    ]
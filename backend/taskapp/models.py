@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 import uuid
@@ -13,10 +14,75 @@ class AnalyzedTask(models.Model):
     dependency = models.FloatField()
     due_date = models.DateField(null=True, blank=True)
 
+    # Raw task inputs, kept so a session can be re-analyzed incrementally
+    estimated_hours = models.IntegerField(null=True, blank=True)
+    importance_rating = models.IntegerField(null=True, blank=True)
+    # no longer written: a task's dependencies are its TaskEdge rows
+    # (rows saved before those existed were backfilled into them)
+    dependencies = models.JSONField(default=list)
+
     created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # top-N of one session straight from the index
+            models.Index(fields=['session_id', '-score'], name='analyzedtask_session_score'),
+            # latest analyzed values of a task (feedback lookups)
+            models.Index(fields=['task_id', '-created_at'], name='analyzedtask_task_latest'),
+        ]
+
+
+class TaskEdge(models.Model):
+    """
+    One dependency edge of a saved session: task `source` depends on
+    task `target`. The only stored copy of a task's dependencies;
+    indexed both ways so a session's graph loads and is edited in place.
+    """
+    session_id = models.UUIDField()
+    source = models.CharField(max_length=100)
+    target = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            # forward adjacency: what a task depends on
+            models.Index(fields=['session_id', 'source'], name='taskedge_session_source'),
+            # reverse adjacency: who depends on a task
+            models.Index(fields=['session_id', 'target'], name='taskedge_session_target'),
+        ]
+
+
+class AnalysisSession(models.Model):
+    """
+    One row per analyze call, so the latest session is a single indexed
+    lookup instead of a sort over the whole AnalyzedTask history.
+    """
+    session_id = models.UUIDField(unique=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    strategy = models.CharField(max_length=20, blank=True)
+    task_count = models.PositiveIntegerField(default=0)
+
+    # Scoring inputs shared by all tasks (empty for sessions saved before
+    # incremental re-analysis existed)
+    today = models.DateField(null=True, blank=True)
+    weights = models.JSONField(default=dict)
+    dependency_mode = models.CharField(max_length=20, default="direct")
+
+    # Top suggestions rendered at analyze time, served as-is by /suggest/
+    suggestions = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    etag = models.CharField(max_length=64, blank=True)
+
+    # Set when retention archived the session: its AnalyzedTask rows are
+    # deleted and only this row (with the score roll-up) is kept
+    archived_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    avg_score = models.FloatField(null=True, blank=True)
+    max_score = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Session {self.session_id}"
 
 
 class GlobalSettings(models.Model):
@@ -32,6 +98,9 @@ class GlobalSettings(models.Model):
     weight_effort = models.FloatField(default=0.2)
     weight_dependency = models.FloatField(default=0.1)
 
+    # Bumped by every fold of the feedback log (compare-and-swap token)
+    weights_version = models.BigIntegerField(default=0)
+
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
@@ -44,6 +113,8 @@ class GlobalSettings(models.Model):
 
 
 class Feedback(models.Model):
+    # Append-only log: the weights are learned by folding the rows not
+    # folded yet (taskapp.weights.reduce_feedback)
     task_id = models.CharField(max_length=100)
     was_helpful = models.BooleanField()
 
@@ -52,7 +123,20 @@ class Feedback(models.Model):
     effort = models.FloatField(default=0)
     dependency = models.FloatField(default=0)
 
+    # Set in the same transaction that folds the row into the weights
+    folded = models.BooleanField(default=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # pending log only, however long the folded history gets
+            models.Index(
+                fields=['id'],
+                condition=models.Q(folded=False),
+                name='feedback_pending'
+            ),
+        ]
+
     def __str__(self):
         return f"Feedback on {self.task_id}"
@@ -0,0 +1,32 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Newline-delimited JSON: one task object per line.
+
+    Returns a lazy iterator, so the body is parsed line by line while
+    it is being consumed instead of being loaded into memory at once.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8")
+        return self._iter_objects(stream, encoding)
+
+    def _iter_objects(self, stream, encoding):
+        if stream is None:
+            return
+
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line.decode(encoding))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error on line {line_number} - {exc}")
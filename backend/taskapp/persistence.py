@@ -0,0 +1,318 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import logging
+import uuid
+
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import AnalysisSession, AnalyzedTask, TaskEdge
+
+from scoring import TaskRecord, build_explanation, graph_from_edges, rank_tasks
+
+
+logger = logging.getLogger("taskapp.persistence")
+
+# Single background writer: keeps async saves ordered and never runs two
+# SQLite write transactions at once.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="taskapp-persist")
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def build_suggestions(scored_tasks, size):
+    """
+    Render the top `size` tasks the way /suggest/ returns them.
+    """
+    return [
+        {
+            "id": task.id,
+            "title": task.title,
+            "score": task.score,
+            "due_date": task.due_date,
+            "why": task.explanation
+        }
+        for task in rank_tasks(scored_tasks, size)
+    ]
+
+
+def _top_rows(session_id, limit):
+    return (
+        AnalyzedTask.objects
+        .filter(session_id=session_id)
+        .order_by('-score')[:limit]
+    )
+
+
+def _suggestion_of_row(t, dependency_mode="direct"):
+    components = {
+        "urgency": t.urgency,
+        "importance": t.importance,
+        "effort": t.effort,
+        "dependency": t.dependency
+    }
+
+    return {
+        "id": t.task_id,
+        "title": t.title,
+        "score": t.score,
+        "due_date": t.due_date,
+        "why": build_explanation(components, dependency_mode)
+    }
+
+
+def suggestions_from_rows(session_id, limit, dependency_mode="direct"):
+    """
+    Top `limit` suggestions of a session read from the
+    (session_id, -score) index, explanations rendered on the fly.
+    """
+    return [
+        _suggestion_of_row(t, dependency_mode)
+        for t in _top_rows(session_id, limit)
+    ]
+
+
+async def asuggestions_from_rows(session_id, limit, dependency_mode="direct"):
+    """
+    Async variant of suggestions_from_rows.
+    """
+    return [
+        _suggestion_of_row(t, dependency_mode)
+        async for t in _top_rows(session_id, limit)
+    ]
+
+
+def latest_components(task_ids):
+    """
+    Component scores of the latest analysis of each task id, in one
+    query over the (task_id, -created_at) index. Unknown ids are missing
+    from the returned {task_id: (U, I, E, D)} dict.
+    """
+    rows = (
+        AnalyzedTask.objects
+        .filter(task_id__in=set(task_ids))
+        .annotate(rank=Window(
+            RowNumber(),
+            partition_by=F("task_id"),
+            order_by=F("created_at").desc()
+        ))
+        .filter(rank=1)
+        .values_list("task_id", "urgency", "importance", "effort", "dependency")
+    )
+    return {task_id: tuple(components) for task_id, *components in rows}
+
+
+def _task_row(session_id, task, created_at):
+    return AnalyzedTask(
+        session_id=session_id,
+        task_id=task.id,
+        title=task.title,
+        score=task.score,
+        urgency=task.urgency,
+        importance=task.importance_score,
+        effort=task.effort,
+        dependency=task.dependency,
+        due_date=task.due_date,
+        estimated_hours=task.estimated_hours,
+        importance_rating=task.importance,
+        created_at=created_at
+    )
+
+
+def _edge_rows(session_id, tasks):
+    for task in tasks:
+        for dep in task.dependencies:
+            yield TaskEdge(session_id=session_id, source=task.id, target=dep)
+
+
+# Columns rewritten when a task is rescored
+_RESCORED_FIELDS = [
+    "title", "score", "urgency", "importance", "effort", "dependency",
+    "due_date", "estimated_hours", "importance_rating"
+]
+
+
+def save_session(session_id, scored_tasks, strategy="", today=None,
+                 weights=None, batch_size=500, snapshot_size=10,
+                 dependency_mode="direct"):
+    """
+    Save the scored tasks of one analysis session with batched
+    bulk_create calls inside a single transaction (one commit instead
+    of one per row), plus its AnalysisSession row carrying the
+    precomputed suggestion snapshot and the inputs needed to
+    re-analyze it incrementally (including its TaskEdge rows).
+    """
+    created_at = timezone.now()
+
+    rows = (_task_row(session_id, task, created_at) for task in scored_tasks)
+
+    with transaction.atomic():
+        for chunk in _chunks(rows, batch_size):
+            AnalyzedTask.objects.bulk_create(chunk)
+        for chunk in _chunks(_edge_rows(session_id, scored_tasks), batch_size):
+            TaskEdge.objects.bulk_create(chunk)
+
+        AnalysisSession.objects.create(
+            session_id=session_id,
+            created_at=created_at,
+            strategy=strategy,
+            dependency_mode=dependency_mode,
+            task_count=len(scored_tasks),
+            today=today,
+            weights=weights or {},
+            suggestions=build_suggestions(scored_tasks, snapshot_size),
+            etag=uuid.uuid4().hex
+        )
+
+
+async def asave_session(session_id, scored_tasks, strategy="", today=None,
+                        weights=None, batch_size=500, snapshot_size=10,
+                        dependency_mode="direct"):
+    """
+    Async variant of save_session for the ASGI views. The async ORM has
+    no transactions, so the AnalysisSession row is written last: /suggest/
+    only finds a session once all of its task rows are in.
+    """
+    created_at = timezone.now()
+
+    rows = (_task_row(session_id, task, created_at) for task in scored_tasks)
+    for chunk in _chunks(rows, batch_size):
+        await AnalyzedTask.objects.abulk_create(chunk)
+    for chunk in _chunks(_edge_rows(session_id, scored_tasks), batch_size):
+        await TaskEdge.objects.abulk_create(chunk)
+
+    await AnalysisSession.objects.acreate(
+        session_id=session_id,
+        created_at=created_at,
+        strategy=strategy,
+        dependency_mode=dependency_mode,
+        task_count=len(scored_tasks),
+        today=today,
+        weights=weights or {},
+        suggestions=build_suggestions(scored_tasks, snapshot_size),
+        etag=uuid.uuid4().hex
+    )
+
+
+def load_session_tasks(session_id):
+    """
+    Stored task inputs of one session as TaskRecords keyed by task id,
+    plus a task id → row pk map so rows can be updated in place. Each
+    task's dependencies come from its TaskEdge rows, in pk order.
+    """
+    rows = (
+        AnalyzedTask.objects
+        .filter(session_id=session_id)
+        .order_by("pk")
+        .values_list("pk", "task_id", "title", "due_date", "estimated_hours", "importance_rating")
+    )
+
+    tasks = {}
+    row_ids = {}
+    for pk, task_id, title, due_date, estimated_hours, importance_rating in rows:
+        row_ids[task_id] = pk
+        tasks[task_id] = TaskRecord(task_id, title, due_date, estimated_hours, importance_rating)
+
+    edges = (
+        TaskEdge.objects
+        .filter(session_id=session_id)
+        .order_by("pk")
+        .values_list("source", "target")
+    )
+    for source, target in edges.iterator(chunk_size=10000):
+        tasks[source].dependencies.append(target)
+
+    return tasks, row_ids
+
+
+def session_graph(tasks):
+    """
+    Dependency graph of the tasks loaded by load_session_tasks (same
+    shape as build_dependency_graph), from their stored edges.
+    """
+    return graph_from_edges(
+        tasks, ((task.id, dep) for task in tasks.values() for dep in task.dependencies)
+    )
+
+
+def update_session(session, rescored_tasks, removed_ids, row_ids, task_count,
+                   batch_size=500, snapshot_size=10, edited_tasks=(),
+                   changed_fields=()):
+    """
+    Write an incremental re-analysis of a session in one transaction:
+    delete removed tasks, update rescored rows in place (row_ids maps
+    task id → row pk), insert added ones, replace the edges of removed
+    and `edited_tasks`, then refresh the suggestion snapshot and its
+    etag. `changed_fields` are extra session fields to save.
+    """
+    changed_rows = []
+    new_rows = []
+    for task in rescored_tasks:
+        row = _task_row(session.session_id, task, session.created_at)
+        pk = row_ids.get(task.id)
+        if pk is not None:
+            row.pk = pk
+            changed_rows.append(row)
+        else:
+            new_rows.append(row)
+
+    with transaction.atomic():
+        for chunk in _chunks(removed_ids, batch_size):
+            AnalyzedTask.objects.filter(
+                session_id=session.session_id, task_id__in=chunk
+            ).delete()
+
+        # edges out of removed / edited tasks, via the (session, source)
+        # index; rewritten from each edited id's final state
+        edited = {task.id: task for task in edited_tasks}
+        stale = list(removed_ids) + list(edited)
+        for chunk in _chunks(stale, batch_size):
+            TaskEdge.objects.filter(
+                session_id=session.session_id, source__in=chunk
+            ).delete()
+        TaskEdge.objects.bulk_create(
+            _edge_rows(session.session_id, edited.values()), batch_size=batch_size
+        )
+
+        AnalyzedTask.objects.bulk_update(changed_rows, _RESCORED_FIELDS, batch_size=batch_size)
+        AnalyzedTask.objects.bulk_create(new_rows, batch_size=batch_size)
+
+        session.task_count = task_count
+        session.suggestions = suggestions_from_rows(
+            session.session_id, snapshot_size, session.dependency_mode
+        )
+        session.etag = uuid.uuid4().hex
+        session.save(update_fields=["task_count", "suggestions", "etag", *changed_fields])
+
+
+def _save_session_in_background(session_id, *args, **kwargs):
+    try:
+        save_session(session_id, *args, **kwargs)
+    except Exception:
+        # nobody waits on the future: the client already has the session id
+        logger.exception("Background save of session %s failed", session_id)
+        raise
+    finally:
+        # worker thread owns its connection
+        connection.close()
+
+
+def save_session_async(session_id, scored_tasks, **kwargs):
+    """
+    Queue the session for saving on the background writer thread and
+    return immediately, so the response does not wait for the INSERTs.
+    The session shows up in /suggest/ once the write has finished; a
+    failed write is logged to "taskapp.persistence" (the session is lost).
+    """
+    return _writer.submit(
+        _save_session_in_background, session_id, scored_tasks, **kwargs
+    )
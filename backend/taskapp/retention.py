@@ -0,0 +1,105 @@
+import time
+from datetime import timedelta
+
+from django.db.models import Avg, Max
+from django.utils import timezone
+
+from .models import AnalysisSession, AnalyzedTask, TaskEdge
+
+
+def _delete_in_chunks(queryset, chunk_size, pause=0):
+    """
+    Delete the rows of `queryset` by primary key, `chunk_size` at a time,
+    each chunk in its own short transaction (autocommit) so SQLite's
+    write lock is released between chunks. Returns the number deleted.
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        # pk order walks the primary key index (Meta.ordering would sort
+        # every remaining row for each chunk)
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            return deleted
+        deleted += model.objects.filter(pk__in=pks).delete()[0]
+        if pause:
+            time.sleep(pause)
+
+
+def archive_sessions(keep, now=None):
+    """
+    Roll every session but the newest `keep` into its AnalysisSession
+    row: score average / max are stored and the session is marked
+    archived. Its task rows are removed by delete_archived_rows.
+    Returns the number of sessions archived.
+    """
+    now = now or timezone.now()
+    keep = max(keep, 1)  # /suggest/ always needs the latest session
+
+    hot = list(
+        AnalysisSession.objects
+        .order_by("-created_at")
+        .values_list("created_at", flat=True)[:keep]
+    )
+    if len(hot) < keep:
+        return 0
+
+    # older than the oldest hot session (sessions saved meanwhile are newer)
+    to_archive = list(
+        AnalysisSession.objects
+        .filter(archived_at__isnull=True, created_at__lt=hot[-1])
+        .only("pk", "session_id")
+    )
+
+    for session in to_archive:
+        rollup = AnalyzedTask.objects.filter(session_id=session.session_id).aggregate(
+            avg_score=Avg("score"), max_score=Max("score")
+        )
+        AnalysisSession.objects.filter(pk=session.pk).update(
+            archived_at=now,
+            avg_score=rollup["avg_score"],
+            max_score=rollup["max_score"]
+        )
+
+    return len(to_archive)
+
+
+def delete_archived_rows(chunk_size=500, pause=0):
+    """
+    Delete the AnalyzedTask and TaskEdge rows of archived sessions in
+    bounded chunks. Safe to interrupt: the next run picks up what is left.
+    """
+    archived = AnalysisSession.objects.filter(archived_at__isnull=False).values("session_id")
+    deleted = 0
+    for model in (AnalyzedTask, TaskEdge):
+        rows = model.objects.filter(session_id__in=archived)
+        deleted += _delete_in_chunks(rows, chunk_size, pause)
+    return deleted
+
+
+def purge_sessions(max_age_days, chunk_size=500, pause=0, now=None):
+    """
+    Drop archived session summaries older than `max_age_days`.
+    """
+    now = now or timezone.now()
+    old = AnalysisSession.objects.filter(
+        archived_at__isnull=False,
+        created_at__lt=now - timedelta(days=max_age_days)
+    )
+    return _delete_in_chunks(old, chunk_size, pause)
+
+
+def apply_retention(keep, max_age_days=None, chunk_size=500, pause=0):
+    """
+    One retention pass: archive old sessions, delete their task rows,
+    then purge summaries past `max_age_days` (kept forever if None).
+    Returns a dict of counts.
+    """
+    result = {
+        "archived_sessions": archive_sessions(keep),
+        "deleted_rows": delete_archived_rows(chunk_size, pause),
+        "purged_sessions": 0,
+    }
+    if max_age_days is not None:
+        result["purged_sessions"] = purge_sessions(max_age_days, chunk_size, pause)
+    return result
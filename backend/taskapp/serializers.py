@@ -11,3 +11,8 @@ class TaskSerializer(serializers.Serializer):
         required=True
     )
 
+
+
+class FeedbackSerializer(serializers.Serializer):
+    task_id = serializers.CharField(required=True)
+    was_helpful = serializers.BooleanField(required=True)
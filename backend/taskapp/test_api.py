@@ -0,0 +1,351 @@
+import json
+import uuid
+
+import pytest
+
+
+TODAY = "2024-01-01"
+
+
+def _task(tid, deps=(), hours=2, importance=5, due="2024-01-10"):
+    return {
+        "id": tid,
+        "title": f"Task {tid}",
+        "due_date": due,
+        "estimated_hours": hours,
+        "importance": importance,
+        "dependencies": list(deps),
+    }
+
+
+def _analyze(client, tasks, **options):
+    response = client.post(
+        "/api/tasks/analyze/",
+        json.dumps({"tasks": tasks, "today": TODAY, **options}),
+        content_type="application/json"
+    )
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+def _patch(client, session_id, **diff):
+    return client.patch(
+        f"/api/tasks/analyze/{session_id}/",
+        json.dumps(diff),
+        content_type="application/json"
+    )
+
+
+def _ndjson(client, body, query=""):
+    # the test client drops CONTENT_TYPE for an empty body, so set it directly
+    return client.generic(
+        "POST",
+        f"/api/tasks/analyze/?today={TODAY}{query}",
+        body,
+        CONTENT_TYPE="application/x-ndjson"
+    )
+
+
+def _ndjson_lines(response):
+    assert response.status_code == 200, response.content
+    assert response["Content-Type"] == "application/x-ndjson"
+    return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+
+@pytest.fixture
+def session(api_client):
+    tasks = [_task("1"), _task("2", ["1"]), _task("3", ["1"])]
+    return _analyze(api_client, tasks)["session_id"]
+
+
+def test_patch_applies_diff(api_client, session):
+    response = _patch(
+        api_client, session,
+        added=[_task("4", ["2"])],
+        changed=[_task("3", importance=9)],
+        removed=["2"]
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert body["removed"] == ["2"]
+    assert {task["id"] for task in body["tasks"]} >= {"3", "4"}
+
+
+@pytest.mark.parametrize("diff, ids", [
+    ({"removed": ["1", "1"]}, ["1"]),
+    ({"changed": [_task("1"), _task("1", importance=9)]}, ["1"]),
+    ({"added": [_task("4", ["1"]), _task("4", ["2"])]}, ["4"]),
+    ({"removed": ["1"], "changed": [_task("1")]}, ["1"]),
+    ({"removed": ["1"], "added": [_task("1")]}, ["1"]),
+])
+def test_patch_rejects_repeated_ids(api_client, session, diff, ids):
+    response = _patch(api_client, session, **diff)
+
+    assert response.status_code == 400
+    assert response.json()["ids"] == ids
+
+
+def test_patch_rejects_unknown_and_existing_ids(api_client, session):
+    assert _patch(api_client, session, removed=["9"]).json()["ids"] == ["9"]
+    assert _patch(api_client, session, added=[_task("2")]).json()["ids"] == ["2"]
+
+
+def test_patch_keeps_stored_edges_in_step_with_tasks(api_client, session):
+    from taskapp.models import AnalyzedTask, TaskEdge
+
+    response = _patch(
+        api_client, session,
+        added=[_task("4", ["2"])],
+        changed=[_task("3", ["2", "1"])]
+    )
+    assert response.status_code == 200
+
+    edges = set(TaskEdge.objects.filter(session_id=session).values_list("source", "target"))
+    assert edges == {("2", "1"), ("3", "2"), ("3", "1"), ("4", "2")}
+    # the edges are the only stored copy of the dependencies
+    assert not AnalyzedTask.objects.filter(session_id=session).exclude(dependencies=[]).exists()
+
+    # re-running from the stored edges matches a fresh analyze, dependency
+    # lists included (in their submitted order)
+    rerun = api_client.post(
+        f"/api/tasks/analyze/{session}/", "{}", content_type="application/json"
+    ).json()
+    fresh = _analyze(
+        api_client, [_task("1"), _task("2", ["1"]), _task("3", ["2", "1"]), _task("4", ["2"])]
+    )
+    inputs = lambda body: {
+        task["id"]: (task["dependencies"], task["components"]["dependency"])
+        for task in body["tasks"]
+    }
+    assert inputs(rerun) == inputs(fresh)
+
+
+def test_schedule_past_date_max_is_a_bad_request(api_client):
+    response = api_client.post(
+        "/api/tasks/analyze/",
+        json.dumps({
+            "tasks": [_task("1", hours=10 ** 6)],
+            "today": TODAY,
+            "order": "schedule",
+            "capacity_hours": 0.001,
+        }),
+        content_type="application/json"
+    )
+
+    assert response.status_code == 400
+    assert "capacity_hours" in response.json()
+
+
+def test_critical_mode_reports_slack_and_leaves_independent_tasks_alone(api_client):
+    body = _analyze(
+        api_client,
+        [_task("1", hours=2), _task("2", ["1"], hours=3), _task("3", hours=16)],
+        dependency_mode="critical"
+    )
+    tasks = {task["id"]: task for task in body["tasks"]}
+
+    assert tasks["3"]["components"]["dependency"] == 0
+    assert "Blocks" not in tasks["3"]["explanation"]
+    assert tasks["1"]["components"]["dependency"] == 1.0
+    assert tasks["1"]["slack_hours"] == 11
+    assert tasks["3"]["slack_hours"] == 0
+
+
+def test_feedback_batch_size_is_checked_before_validation(api_client):
+    from django.test import override_settings
+
+    with override_settings(FEEDBACK_BATCH_MAX_ITEMS=2):
+        response = api_client.post(
+            "/api/tasks/feedback/batch/",
+            json.dumps({"feedback": [{"bad": "item"}] * 3}),
+            content_type="application/json"
+        )
+
+    assert response.status_code == 400
+    assert response.json() == {"feedback": ["Ensure this list has at most 2 items."]}
+
+
+def test_query_counts_have_their_own_histogram_buckets(api_client):
+    from django.test import override_settings
+
+    from taskapp.instrumentation import BUCKETS_MS, BUCKETS_QUERIES, reset_metrics
+
+    reset_metrics()
+    with override_settings(REQUEST_TIMING_ENABLED=True):
+        _analyze(api_client, [_task("1")])
+        timing = api_client.get("/api/tasks/metrics/").json()["timing"]["analyze"]
+
+    assert list(timing["queries"]["buckets"]) == [str(b) for b in BUCKETS_QUERIES + ("+Inf",)]
+    assert list(timing["total"]["buckets"]) == [str(b) for b in BUCKETS_MS + ("+Inf",)]
+    reset_metrics()
+
+
+def test_score_memo_is_never_slower_than_scoring(monkeypatch):
+    pytest.importorskip("numpy")
+    import gc
+    import time
+    from datetime import date, timedelta
+
+    from scoring import ScoreMemo, TaskRecord, build_dependency_graph
+    from taskapp import views
+
+    weights = {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1}
+
+    def best_times(n, memo):
+        # (with memo, without), best of interleaved runs on the same tasks
+        tasks = [
+            TaskRecord(**dict(
+                _task(str(i), [str(i // 2)] if i else [], importance=i % 10 + 1),
+                due_date=date(2024, 1, 1) + timedelta(days=i % 40)
+            ))
+            for i in range(n)
+        ]
+        graph = build_dependency_graph(tasks)
+        best = {memo: float("inf"), None: float("inf")}
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(9):
+                for candidate in best:
+                    monkeypatch.setattr(views, "score_memo", candidate)
+                    start = time.perf_counter()
+                    views._score_tasks(tasks, date(2024, 1, 1), graph, weights)
+                    best[candidate] = min(best[candidate], time.perf_counter() - start)
+        finally:
+            gc.enable()
+        return best[memo], best[None]
+
+    # per-task path: warm memo hits beat recomputing
+    with_memo, without = best_times(400, ScoreMemo())
+    assert with_memo <= without
+
+    # vectorized path: the memo is not even consulted
+    memo = ScoreMemo()
+    with_memo, without = best_times(5000, memo)
+    assert with_memo <= without * 1.2
+    assert memo.stats()["hits"] + memo.stats()["misses"] == 0
+
+
+def test_ndjson_streams_header_and_ranked_rows(api_client):
+    tasks = [_task(str(i), importance=i + 1, due=f"2024-01-{10 + i}") for i in range(6)]
+    body = "\n".join(json.dumps(task) for task in tasks)
+
+    header, *rows = _ndjson_lines(_ndjson(api_client, body, "&limit=2"))
+
+    expected = _analyze(api_client, tasks, limit=2)["tasks"]
+    assert set(header) == {"session_id", "total"}
+    assert header["total"] == 6
+    assert [(row["id"], row["score"]) for row in rows] == [
+        (task["id"], task["score"]) for task in expected
+    ]
+
+
+def test_ndjson_parse_error_names_the_line(api_client):
+    body = json.dumps(_task("1")) + "\n\n{not json\n" + json.dumps(_task("2"))
+
+    response = _ndjson(api_client, body)
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("NDJSON parse error on line 3 - ")
+
+
+def test_ndjson_error_keys_are_stream_positions_across_chunks(api_client):
+    tasks = [_task(str(i)) for i in range(1200)]
+    tasks[5] = {"id": "5"}
+    tasks[1100] = _task("1100", due="not a date")
+    body = "\n".join(json.dumps(task) for task in tasks)
+
+    response = _ndjson(api_client, body)
+
+    assert response.status_code == 400
+    errors = response.json()
+    assert set(errors) == {"5", "1100"}
+    assert "due_date" in errors["1100"]
+    assert "title" in errors["5"]
+
+
+@pytest.mark.parametrize("body", [b"", b"\n\n"])
+def test_ndjson_empty_body_streams_just_the_header(api_client, body):
+    lines = _ndjson_lines(_ndjson(api_client, body))
+
+    assert len(lines) == 1
+    assert lines[0]["total"] == 0
+
+
+@pytest.fixture
+def ranked(api_client):
+    # newest session: 15 tasks, more than the default snapshot of 10
+    tasks = [_task(str(i), importance=i % 10 + 1, due=f"2024-01-{10 + i}") for i in range(15)]
+    body = _analyze(api_client, tasks)
+    return body["session_id"], body["tasks"]
+
+
+def _suggest(client, limit=None, **headers):
+    query = "" if limit is None else f"?limit={limit}"
+    return client.get(f"/api/tasks/suggest/{query}", **headers)
+
+
+def test_suggest_serves_the_snapshot_of_the_newest_session(api_client, ranked, monkeypatch):
+    from taskapp import views
+
+    session_id, tasks = ranked
+    monkeypatch.setattr(
+        views, "suggestions_from_rows", lambda *args: pytest.fail("snapshot not used")
+    )
+
+    body = _suggest(api_client, 4).json()
+
+    assert body["session_id"] == session_id
+    assert [s["id"] for s in body["suggestions"]] == [t["id"] for t in tasks[:4]]
+
+
+def test_suggest_past_the_snapshot_reads_the_task_rows(api_client, ranked, monkeypatch):
+    from taskapp import views
+
+    session_id, tasks = ranked
+    original = views.suggestions_from_rows
+    calls = []
+
+    def from_rows(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(views, "suggestions_from_rows", from_rows)
+
+    body = _suggest(api_client, 12).json()
+
+    assert [args[:2] for args in calls] == [(uuid.UUID(session_id), 12)]
+    assert [s["id"] for s in body["suggestions"]] == [t["id"] for t in tasks[:12]]
+    assert body["suggestions"][:3] == _suggest(api_client).json()["suggestions"]
+
+
+def test_suggest_etag_gives_304_until_the_latest_session_changes(api_client, ranked):
+    session_id, _ = ranked
+
+    etag = _suggest(api_client)["ETag"]
+    not_modified = _suggest(api_client, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+    assert not_modified["ETag"] == etag
+    assert _suggest(api_client, 5)["ETag"] != etag  # per limit
+
+    # PATCH, then a rerun of the latest session, each make a new version
+    seen = {etag}
+    assert _patch(api_client, session_id, changed=[_task("3", importance=10)]).status_code == 200
+    seen.add(_suggest(api_client)["ETag"])
+    api_client.post(f"/api/tasks/analyze/{session_id}/", "{}", content_type="application/json")
+    seen.add(_suggest(api_client)["ETag"])
+    assert len(seen) == 3
+
+    assert _suggest(api_client, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_suggest_follows_the_newest_session(api_client, ranked):
+    older, _ = ranked
+    newer = _analyze(api_client, [_task("a"), _task("b", importance=9)])["session_id"]
+
+    body = _suggest(api_client).json()
+
+    assert body["session_id"] == newer != older
+    assert [s["id"] for s in body["suggestions"]] == ["b", "a"]
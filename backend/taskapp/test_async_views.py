@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+
+TASKS = [
+    {"id": "1", "title": "A", "due_date": "2024-01-10", "estimated_hours": 2,
+     "importance": 5, "dependencies": []},
+    {"id": "2", "title": "B", "due_date": "2024-01-12", "estimated_hours": 4,
+     "importance": 8, "dependencies": ["1"]},
+]
+
+
+def _post(client, url, body):
+    if not isinstance(body, str):
+        body = json.dumps(body)
+    return client.post(url, body, content_type="application/json")
+
+
+def _both(client, name, body):
+    # the same request against the sync view and its async variant
+    return (
+        _post(client, f"/api/tasks/{name}/", body),
+        _post(client, f"/api/tasks/async/{name}/", body),
+    )
+
+
+@pytest.fixture
+def learned_weights(api_client):
+    # feedback folds into the shared weights: put them back afterwards
+    from taskapp import weights
+    from taskapp.models import GlobalSettings
+
+    obj = weights.get_global_settings()
+    before = weights.weights_of(obj)
+    yield
+    GlobalSettings.objects.filter(pk=obj.pk).update(
+        weight_urgency=before["urgency"],
+        weight_importance=before["importance"],
+        weight_effort=before["effort"],
+        weight_dependency=before["dependency"]
+    )
+    weights.publish_weights(before)
+
+
+def test_analyze_async_matches_sync(api_client):
+    sync, async_ = _both(api_client, "analyze", {"tasks": TASKS, "today": "2024-01-01", "limit": 1})
+
+    assert sync.status_code == async_.status_code == 200
+    sync_body, async_body = sync.json(), async_.json()
+    assert sync_body.pop("session_id") != async_body.pop("session_id")
+    assert async_body == sync_body
+
+
+@pytest.mark.parametrize("body", [
+    # cycle
+    {"tasks": [dict(TASKS[0], dependencies=["2"]), TASKS[1]]},
+    # ValidationError from an option and from the tasks
+    {"tasks": TASKS, "limit": -1},
+    {"tasks": [{"id": "1"}]},
+])
+def test_analyze_async_errors_match_sync(api_client, body):
+    sync, async_ = _both(api_client, "analyze", body)
+
+    assert sync.status_code == async_.status_code == 400
+    assert async_.json() == sync.json()
+
+
+@pytest.mark.parametrize("body, detail", [
+    ("[1, 2]", "Expected a JSON object."),
+    ("{not json", "JSON parse error - "),
+])
+def test_analyze_async_parse_errors(api_client, body, detail):
+    response = _post(api_client, "/api/tasks/async/analyze/", body)
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(detail)
+
+
+def test_suggest_async_matches_sync_and_honours_etag(api_client):
+    _post(api_client, "/api/tasks/analyze/", {"tasks": TASKS, "today": "2024-01-01"})
+
+    sync = api_client.get("/api/tasks/suggest/?limit=2")
+    async_ = api_client.get("/api/tasks/async/suggest/?limit=2")
+
+    assert async_.status_code == 200
+    assert async_.json() == sync.json()
+    assert async_["ETag"] == sync["ETag"]
+
+    cached = api_client.get("/api/tasks/async/suggest/?limit=2", HTTP_IF_NONE_MATCH=async_["ETag"])
+    assert cached.status_code == 304
+    assert cached["ETag"] == async_["ETag"]
+    assert cached.content == b""
+
+
+def test_feedback_async_logs_and_folds(api_client, learned_weights):
+    from taskapp.models import AnalyzedTask, Feedback
+    from taskapp.weights import get_weights
+
+    _post(api_client, "/api/tasks/analyze/", {"tasks": TASKS, "today": "2024-01-01"})
+    analyzed = AnalyzedTask.objects.filter(task_id="2").order_by("-created_at").first()
+
+    response = _post(api_client, "/api/tasks/async/feedback/", {"task_id": "2", "was_helpful": True})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["message"] == "Feedback saved. Weights updated."
+    assert body["weights"] == pytest.approx(get_weights())
+    logged = Feedback.objects.order_by("-id").first()
+    assert (logged.task_id, logged.was_helpful, logged.urgency, logged.dependency) == (
+        "2", True, analyzed.urgency, analyzed.dependency
+    )
+
+
+@pytest.mark.parametrize("body", [{"task_id": "2"}, {"task_id": "missing", "was_helpful": False}])
+def test_feedback_async_errors_match_sync(api_client, body):
+    _post(api_client, "/api/tasks/analyze/", {"tasks": TASKS, "today": "2024-01-01"})
+
+    sync, async_ = _both(api_client, "feedback", body)
+
+    assert async_.status_code == sync.status_code
+    assert async_.json() == sync.json()
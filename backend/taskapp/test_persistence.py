@@ -0,0 +1,21 @@
+import logging
+
+import pytest
+
+
+def test_failed_background_save_is_logged(api_client, monkeypatch, caplog):
+    from django.db import OperationalError
+    from taskapp import persistence
+
+    def locked(*args, **kwargs):
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr(persistence, "save_session", locked)
+
+    with caplog.at_level(logging.ERROR, logger="taskapp.persistence"):
+        future = persistence.save_session_async("some-session", [])
+        with pytest.raises(OperationalError):
+            future.result()
+
+    assert "Background save of session some-session failed" in caplog.text
+    assert "database is locked" in caplog.text
@@ -0,0 +1,71 @@
+from datetime import timedelta
+from io import StringIO
+import json
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.fixture
+def sessions(api_client):
+    from taskapp.models import AnalysisSession, AnalyzedTask, TaskEdge
+
+    for model in (AnalysisSession, AnalyzedTask, TaskEdge):
+        model.objects.all().delete()
+
+    tasks = [
+        {"id": "1", "title": "A", "due_date": "2024-01-10", "estimated_hours": 2,
+         "importance": 5, "dependencies": []},
+        {"id": "2", "title": "B", "due_date": "2024-01-12", "estimated_hours": 4,
+         "importance": 8, "dependencies": ["1"]},
+    ]
+    ids = []
+    for _ in range(4):
+        response = api_client.post(
+            "/api/tasks/analyze/",
+            json.dumps({"tasks": tasks, "today": "2024-01-01"}),
+            content_type="application/json"
+        )
+        ids.append(response.json()["session_id"])
+    return ids[::-1]  # newest first
+
+
+def test_retention_archives_old_sessions_and_deletes_their_rows(api_client, sessions):
+    from taskapp.models import AnalysisSession, AnalyzedTask, TaskEdge
+    from taskapp.retention import apply_retention
+
+    result = apply_retention(keep=2, chunk_size=3)
+
+    assert result == {"archived_sessions": 2, "deleted_rows": 6, "purged_sessions": 0}
+    archived = AnalysisSession.objects.filter(archived_at__isnull=False)
+    assert {str(s.session_id) for s in archived} == set(sessions[2:])
+    assert all(s.max_score is not None for s in archived)
+    assert set(map(str, AnalyzedTask.objects.values_list("session_id", flat=True))) == set(sessions[:2])
+    assert set(map(str, TaskEdge.objects.values_list("session_id", flat=True))) == set(sessions[:2])
+
+    # the latest session still serves /suggest/, archived ones answer 410
+    assert api_client.get("/api/tasks/suggest/").json()["session_id"] == sessions[0]
+    response = api_client.patch(
+        f"/api/tasks/analyze/{sessions[3]}/", "{}", content_type="application/json"
+    )
+    assert response.status_code == 410
+
+
+def test_purge_drops_old_archived_summaries(api_client, sessions):
+    from taskapp.models import AnalysisSession
+    from taskapp.retention import apply_retention, purge_sessions
+
+    apply_retention(keep=3)
+    assert purge_sessions(max_age_days=1) == 0
+    assert purge_sessions(max_age_days=1, now=timezone.now() + timedelta(days=2)) == 1
+    assert AnalysisSession.objects.count() == 3
+
+
+def test_prune_sessions_command(api_client, sessions):
+    out = StringIO()
+    call_command("prune_sessions", keep=1, chunk_size=2, stdout=out)
+
+    assert out.getvalue().strip() == (
+        "Archived 3 sessions, deleted 9 task rows, purged 0 old summaries."
+    )
@@ -1,5 +1,5 @@
 import pytest
-from datetime import date
+from datetime import date, timedelta
 
 from ..scoring import(
     compute_urgency,
@@ -9,7 +9,25 @@ from ..scoring import(
     compute_final_score,
     build_dependency_graph,
     detect_cycle,
+    find_cycles,
     count_working_days,
+    HolidayCalendar,
+    build_explanation,
+    score_batch,
+    score_parallel,
+    rank_tasks,
+    apply_graph_diff,
+    TaskRecord,
+    fold_feedback,
+    fold_feedback_batch,
+    ScoreMemo,
+    graph_metrics,
+    dependency_inputs,
+    topological_order,
+    graph_from_edges,
+    schedule_tasks,
+    add_working_days,
+    UrgencyTable,
 )
 
 
@@ -121,6 +139,35 @@ def test_detect_cycle_none():
     assert cycle is None
 
 
+def test_detect_cycle_long_chain_no_recursion_limit():
+    n = 5000
+    tasks = [{"id": i, "dependencies": [i + 1]} for i in range(n)]
+    tasks.append({"id": n, "dependencies": [0]})
+
+    graph = build_dependency_graph(tasks)
+    cycle = detect_cycle(graph)
+
+    assert cycle[0] == cycle[-1]
+    assert len(cycle) == n + 2
+
+
+def test_find_cycles_reports_every_group():
+    tasks = [
+        {"id": "A", "dependencies": ["B"]},
+        {"id": "B", "dependencies": ["A"]},
+        {"id": "C", "dependencies": ["D"]},
+        {"id": "D", "dependencies": ["E"]},
+        {"id": "E", "dependencies": ["C", "X"]},
+        {"id": "F", "dependencies": ["F"]},
+        {"id": "G", "dependencies": ["A"]},
+    ]
+
+    graph = build_dependency_graph(tasks)
+    groups = sorted(sorted(g) for g in find_cycles(graph))
+
+    assert groups == [["A", "B"], ["C", "D", "E"], ["F"]]
+
+
 # dependency score tests
 
 
@@ -141,6 +188,24 @@ def test_dependency_score():
     assert score_B == 0
 
 
+def test_dependency_graph_precomputes_counts():
+    tasks = [
+        {"id": "A", "dependencies": []},
+        {"id": "B", "dependencies": ["A"]},
+        {"id": "C", "dependencies": ["A", "B"]},
+    ]
+
+    graph = build_dependency_graph(tasks)
+
+    assert graph["dependent_counts"] == {"A": 2, "B": 1, "C": 0}
+    assert graph["max_dependents"] == 2
+    assert compute_dependency_score("B", graph) == 0.5
+
+    # hand-built graphs without the precomputed fields still work
+    bare = {"forward": graph["forward"], "reverse": graph["reverse"]}
+    assert compute_dependency_score("B", bare) == 0.5
+
+
 
 # final score tests
 
@@ -177,6 +242,43 @@ def test_working_day_count():
     assert count_working_days(d1, d2) == 2
 
 
+def _count_working_days_by_walking(start, end):
+    days = 0
+    current = start + timedelta(days=1)
+    while current <= end:
+        if current.weekday() < 5:
+            days += 1
+        current += timedelta(days=1)
+    return days
+
+
+def test_working_day_count_matches_day_walk():
+    start = date(2024, 1, 1)
+    for offset in range(7):
+        s = start + timedelta(days=offset)
+        for span in range(-10, 60):
+            e = s + timedelta(days=span)
+            assert count_working_days(s, e) == _count_working_days_by_walking(s, e)
+
+
+def test_working_day_count_far_future():
+    d1 = date(2025, 1, 1)
+    d2 = date(2030, 1, 1)
+
+    assert count_working_days(d1, d2) == _count_working_days_by_walking(d1, d2)
+
+
+def test_working_day_count_with_holidays():
+    calendar = HolidayCalendar([
+        date(2024, 1, 2),   # Tuesday
+        date(2024, 1, 6),   # Saturday, no effect
+    ])
+
+    assert count_working_days(date(2024, 1, 1), date(2024, 1, 8), calendar) == 4
+    assert count_working_days(date(2024, 1, 2), date(2024, 1, 8), calendar) == 4
+    assert compute_urgency("2024-01-03", "2024-01-01", calendar=calendar) == 1 - 1 / 30
+
+
 
 
 
@@ -319,3 +421,546 @@ def test_equal_score_behavior():
     scores = [compute_final_score(t, "2025-01-10", graph, weights)["score"] for t in tasks]
 
     assert scores[0] == scores[1] == scores[2]
+
+
+
+# vectorized batch scoring tests
+
+def test_score_batch_matches_scalar_reference():
+    pytest.importorskip("numpy")
+    import random
+
+    rng = random.Random(7)
+    tasks = []
+    for i in range(400):
+        due = date(2024, 1, 1) + timedelta(days=rng.randint(-20, 120))
+        tasks.append({
+            "id": i,
+            "due_date": None if i % 17 == 0 else due.isoformat(),
+            "importance": None if i % 13 == 0 else rng.randint(-2, 12),
+            "estimated_hours": None if i % 11 == 0 else rng.randint(-1, 12),
+            "dependencies": [rng.randrange(i)] if i and rng.random() < 0.5 else [],
+        })
+
+    today = "2024-01-10"
+    graph = build_dependency_graph(tasks)
+    weights = {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1}
+
+    batch = score_batch(
+        [t["due_date"] for t in tasks],
+        [t["importance"] for t in tasks],
+        [t["estimated_hours"] for t in tasks],
+        [graph["dependent_counts"][t["id"]] for t in tasks],
+        today,
+        weights,
+        graph["max_dependents"],
+    )
+
+    for i, task in enumerate(tasks):
+        expected = compute_final_score(task, today, graph, weights)
+        for name, value in expected["components"].items():
+            assert batch[name][i] == pytest.approx(value)
+        assert batch["score"][i] == pytest.approx(expected["score"])
+        assert batch["explanation"][i] == build_explanation(expected["components"])
+
+
+def test_score_batch_respects_holidays():
+    pytest.importorskip("numpy")
+    calendar = HolidayCalendar([date(2024, 1, 2)])
+
+    batch = score_batch(
+        ["2024-01-03"], [5], [4], [0], "2024-01-01",
+        {"urgency": 1, "importance": 0, "effort": 0, "dependency": 0},
+        0, calendar=calendar,
+    )
+
+    assert batch["urgency"][0] == pytest.approx(
+        compute_urgency("2024-01-03", "2024-01-01", calendar=calendar)
+    )
+
+
+def test_score_parallel_matches_batch_and_ranking():
+    pytest.importorskip("numpy")
+    import random
+
+    rng = random.Random(11)
+    tasks = []
+    for i in range(250):
+        due = date(2024, 1, 1) + timedelta(days=rng.randint(-20, 60))
+        tasks.append({
+            "id": i,
+            "due_date": None if i % 17 == 0 else due.isoformat(),
+            "importance": None if i % 13 == 0 else rng.choice([1, 5, 5, 10]),
+            "estimated_hours": None if i % 11 == 0 else rng.choice([1, 4, 8]),
+            "dependencies": [rng.randrange(i)] if i and rng.random() < 0.5 else [],
+        })
+
+    today = "2024-01-10"
+    graph = build_dependency_graph(tasks)
+    weights = {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1}
+
+    batch = score_batch(
+        [t["due_date"] for t in tasks],
+        [t["importance"] for t in tasks],
+        [t["estimated_hours"] for t in tasks],
+        [graph["dependent_counts"][t["id"]] for t in tasks],
+        today,
+        weights,
+        graph["max_dependents"],
+    )
+    expected = rank_tasks([
+        {"id": t["id"], "score": s} for t, s in zip(tasks, batch["score"].tolist())
+    ])
+
+    records = [TaskRecord(**t) for t in tasks]
+    ranked = score_parallel(records, today, graph, weights, workers=2, shard_size=40)
+
+    assert [r.id for r in ranked] == [e["id"] for e in expected]
+    assert [r.score for r in records] == batch["score"].tolist()
+    assert [r.explanation for r in records] == batch["explanation"]
+
+    records = [TaskRecord(**t) for t in tasks]
+    top = score_parallel(records, today, graph, weights, workers=2, shard_size=40, top=15)
+    assert [r.id for r in top] == [e["id"] for e in expected[:15]]
+
+
+def test_score_parallel_recovers_from_a_dead_worker():
+    pytest.importorskip("numpy")
+    import os
+    from concurrent.futures.process import BrokenProcessPool
+    from .. import scoring
+
+    tasks = [
+        {"id": i, "due_date": "2024-01-20", "importance": i % 10 + 1,
+         "estimated_hours": i % 8, "dependencies": [i - 1] if i else []}
+        for i in range(60)
+    ]
+    graph = build_dependency_graph(tasks)
+    weights = {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1}
+    expected = [r.id for r in score_parallel(
+        [TaskRecord(**t) for t in tasks], "2024-01-10", graph, weights, workers=2
+    )]
+
+    broken = scoring._get_pool(2)
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    # scored in-process this time, a fresh pool next time
+    for _ in range(2):
+        ranked = score_parallel(
+            [TaskRecord(**t) for t in tasks], "2024-01-10", graph, weights, workers=2
+        )
+        assert [r.id for r in ranked] == expected
+    assert scoring._get_pool(2) is not broken
+
+
+def test_get_pool_hands_concurrent_callers_one_pool():
+    pytest.importorskip("numpy")
+    import threading
+    from .. import scoring
+
+    barrier = threading.Barrier(8)
+    pools = []
+
+    def get():
+        barrier.wait()
+        pools.append(scoring._get_pool(3))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(pool) for pool in pools}) == 1
+    scoring._discard_pool(3, pools[0])
+
+
+
+# ranking tests
+
+def test_rank_tasks_top_k_matches_full_sort():
+    import random
+
+    rng = random.Random(3)
+    scored = [{"id": i, "score": rng.choice([0.1, 0.5, 0.5, 0.9, rng.random()])} for i in range(300)]
+    full = sorted(scored, key=lambda x: x["score"], reverse=True)
+
+    assert rank_tasks(scored) == full
+    assert rank_tasks(scored, limit=20) == full[:20]
+    assert rank_tasks(scored, limit=20, offset=40) == full[40:60]
+    assert rank_tasks(scored, limit=0) == []
+    assert rank_tasks(scored, offset=290) == full[290:]
+
+
+
+# incremental graph update tests
+
+def test_apply_graph_diff_matches_rebuild():
+    import random
+
+    rng = random.Random(11)
+    ids = list(range(40))
+    tasks = {
+        i: {"id": i, "dependencies": rng.sample(range(60), rng.randint(0, 3))}
+        for i in ids
+    }
+    graph = build_dependency_graph(list(tasks.values()))
+
+    for _ in range(200):
+        before = dict(graph["dependent_counts"]), graph["max_dependents"]
+
+        removed = rng.sample(sorted(tasks), rng.randint(0, 2))
+        for tid in removed:
+            del tasks[tid]
+        upserts = []
+        for _ in range(rng.randint(0, 3)):
+            task = {"id": rng.randrange(60), "dependencies": rng.sample(range(60), rng.randint(0, 3))}
+            tasks[task["id"]] = task
+            upserts.append(task)
+
+        rescore, new_edges = apply_graph_diff(graph, upserts, removed)
+        rebuilt = build_dependency_graph(list(tasks.values()))
+
+        assert graph["forward"] == rebuilt["forward"]
+        assert graph["dependent_counts"] == rebuilt["dependent_counts"]
+        assert graph["max_dependents"] == rebuilt["max_dependents"]
+        assert {k: sorted(v) for k, v in graph["reverse"].items()} == \
+            {k: sorted(v) for k, v in rebuilt["reverse"].items()}
+
+        # every surviving, unedited task whose dependency score moved is flagged
+        upserted = {t["id"] for t in upserts}
+        old_counts, old_max = before
+        for tid in tasks:
+            if tid in upserted or tid not in old_counts:
+                continue
+            old = old_counts[tid] / old_max if old_max else 0.0
+            new = compute_dependency_score(tid, graph)
+            if old != new:
+                assert tid in rescore
+
+        assert all(tid in upserted for tid, _ in new_edges)
+
+
+def test_find_cycles_from_roots_only():
+    tasks = [
+        {"id": "A", "dependencies": ["B"]},
+        {"id": "B", "dependencies": []},
+        {"id": "C", "dependencies": ["D"]},
+        {"id": "D", "dependencies": []},
+    ]
+    graph = build_dependency_graph(tasks)
+
+    _, new_edges = apply_graph_diff(graph, [{"id": "B", "dependencies": ["A"]}])
+
+    assert new_edges == [("B", "A")]
+    assert find_cycles(graph, roots=[tid for tid, _ in new_edges]) == [["B", "A"]]
+    assert find_cycles(graph, roots=["C"]) == []
+
+
+
+# compact task record tests
+
+def test_task_record_works_through_pipeline():
+    dicts = [
+        {"id": "A", "title": "a", "due_date": "2024-01-12", "estimated_hours": 2, "importance": 8, "dependencies": []},
+        {"id": "B", "title": "b", "due_date": "2024-01-20", "estimated_hours": 6, "importance": 3, "dependencies": ["A"]},
+    ]
+    records = [TaskRecord(**d) for d in dicts]
+    weights = {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1}
+
+    dict_graph = build_dependency_graph(dicts)
+    record_graph = build_dependency_graph(records)
+    assert record_graph == dict_graph
+
+    for d, record in zip(dicts, records):
+        expected = compute_final_score(d, "2024-01-10", dict_graph, weights)
+        assert compute_final_score(record, "2024-01-10", record_graph, weights) == expected
+
+        c = expected["components"]
+        record.set_score(expected["score"], c["urgency"], c["importance"], c["effort"], c["dependency"], "x")
+        assert record.components == c
+        assert record.to_dict() == dict(d, score=expected["score"], components=c, explanation="x")
+
+    assert [r.id for r in rank_tasks(records)] == ["A", "B"]
+    assert records[0].get("missing") is None
+    with pytest.raises(KeyError):
+        records[0]["missing"]
+
+
+
+# feedback learning tests
+
+def _sequential_feedback(weights, log, lr=0.05):
+    # the original submit_feedback step, one feedback at a time
+    w = dict(weights)
+    for was_helpful, U, I, E, D in log:
+        sign = 1 if was_helpful else -1
+        w["urgency"] += sign * lr * U
+        w["importance"] += sign * lr * I
+        w["effort"] += sign * lr * E
+        w["dependency"] += sign * lr * D
+        S = w["urgency"] + w["importance"] + w["effort"] + w["dependency"]
+        w = {key: value / S for key, value in w.items()}
+    return w
+
+
+def test_fold_feedback_matches_sequential_updates():
+    import random
+
+    rng = random.Random(5)
+    log = [
+        (rng.random() < 0.6, rng.random(), rng.random(), rng.random(), rng.random())
+        for _ in range(200)
+    ]
+    weights = {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1}
+
+    assert fold_feedback(weights, log) == _sequential_feedback(weights, log)
+    assert fold_feedback(weights, []) == weights
+
+
+def test_fold_feedback_batch_matches_sequential_updates():
+    pytest.importorskip("numpy")
+    import random
+
+    rng = random.Random(9)
+    log = [
+        (rng.random() < 0.5, rng.random(), rng.random(), rng.random(), rng.random())
+        for _ in range(1000)
+    ]
+    # stored weights that drifted off a sum of exactly 1
+    weights = {"urgency": 0.41, "importance": 0.3, "effort": 0.2, "dependency": 0.1}
+
+    expected = _sequential_feedback(weights, log)
+    for chunk_size in (1, 7, 256, 5000):
+        folded = fold_feedback_batch(weights, log, chunk_size=chunk_size)
+        assert folded == pytest.approx(expected, rel=1e-9)
+
+    assert fold_feedback_batch(weights, []) == weights
+
+
+
+# score memo tests
+
+def test_score_memo_lru_ttl_and_counters():
+    now = [0.0]
+    memo = ScoreMemo(max_entries=2, ttl=10, clock=lambda: now[0])
+    weights = {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1}
+    task = TaskRecord("a", due_date="2024-01-05", estimated_hours=2, importance=7)
+
+    key = ScoreMemo.memo_key(task, "2024-01-01", weights, 1, 3)
+    assert memo.get(key) is None
+    memo.put(key, (0.5, 1, 1, 1, 1, "x"))
+    assert memo.get(key) == (0.5, 1, 1, 1, 1, "x")
+
+    # same inputs under another id share the entry, other inputs do not
+    same = TaskRecord("b", title="other", due_date="2024-01-05", estimated_hours=2, importance=7)
+    assert ScoreMemo.memo_key(same, "2024-01-01", weights, 1, 3) == key
+    assert ScoreMemo.memo_key(task, "2024-01-02", weights, 1, 3) != key
+    assert ScoreMemo.memo_key(task, "2024-01-01", weights, 2, 3) != key
+    assert ScoreMemo.memo_key(task, "2024-01-01", dict(weights, effort=0.3), 1, 3) != key
+
+    # bounded: least recently used entry goes first
+    memo.put("k2", 2)
+    memo.get(key)
+    memo.put("k3", 3)
+    assert len(memo) == 2
+    assert memo.get("k2") is None
+    assert memo.get(key) is not None
+
+    # expired entries are misses
+    now[0] = 11
+    assert memo.get(key) is None
+
+    assert memo.stats() == {"hits": 3, "misses": 3, "size": 1, "max_entries": 2}
+
+
+
+# graph analytics tests
+
+def _downstream(graph, tid):
+    seen = set()
+    stack = [tid]
+    while stack:
+        for dependent in graph["reverse"][stack.pop()]:
+            if dependent not in seen:
+                seen.add(dependent)
+                stack.append(dependent)
+    return seen
+
+
+def test_graph_metrics_transitive_dependents_match_search():
+    import random
+
+    rng = random.Random(4)
+    tasks = []
+    for i in range(120):
+        deps = [str(rng.randrange(i)) for _ in range(rng.randint(0, 3))] if i else []
+        tasks.append({"id": str(i), "dependencies": deps + (["ghost"] if i % 10 == 0 else [])})
+    graph = build_dependency_graph(tasks)
+
+    metrics = graph_metrics(graph)
+
+    for tid in graph["forward"]:
+        assert metrics["transitive_dependents"][tid] == len(_downstream(graph, tid))
+
+    position = {tid: i for i, tid in enumerate(topological_order(graph))}
+    for tid, deps in graph["forward"].items():
+        for dep in deps:
+            if dep in position:
+                assert position[dep] < position[tid]
+
+
+def test_graph_metrics_chain_and_critical_path():
+    # A → B → C (C waits on B, B on A), D independent, E waits on A
+    tasks = [
+        {"id": "A", "dependencies": []},
+        {"id": "B", "dependencies": ["A"]},
+        {"id": "C", "dependencies": ["B"]},
+        {"id": "D", "dependencies": []},
+        {"id": "E", "dependencies": ["A"]},
+    ]
+    graph = build_dependency_graph(tasks)
+    hours = {"A": 2, "B": 3, "C": 1, "D": 4, "E": 1}
+
+    metrics = graph_metrics(graph, hours)
+
+    assert metrics["downstream_chain"] == {"A": 2, "B": 1, "C": 0, "D": 0, "E": 0}
+    assert metrics["transitive_dependents"]["A"] == 3
+    assert metrics["critical_path"] == 6
+    assert metrics["slack"] == {"A": 0, "B": 0, "C": 0, "D": 2, "E": 3}
+
+    # a long chain outranks a single dependent leaf in transitive mode
+    direct = dependency_inputs(graph, "direct")
+    transitive = dependency_inputs(graph, "transitive")
+    assert direct is graph
+    assert compute_dependency_score("A", transitive) == 1.0
+    assert compute_dependency_score("B", transitive) == pytest.approx(1 / 3)
+    assert graph["dependent_counts"]["A"] == 2
+
+
+def test_graph_metrics_computes_only_what_a_mode_needs():
+    tasks = [
+        {"id": "A", "dependencies": []},
+        {"id": "B", "dependencies": ["A"]},
+        {"id": "C", "dependencies": ["B", "A"]},
+        {"id": "D", "dependencies": []},
+    ]
+    graph = build_dependency_graph(tasks)
+    hours = {"A": 2, "B": 3, "D": 4}
+    full = graph_metrics(graph, hours)
+
+    chain = graph_metrics(graph, hours, only=("downstream_chain",))
+    assert set(chain) == {"order", "downstream_chain"}
+    assert chain["downstream_chain"] == full["downstream_chain"]
+
+    critical = graph_metrics(graph, hours, only=("path_hours", "slack"))
+    assert "transitive_dependents" not in critical
+    assert critical["slack"] == full["slack"]
+    assert critical["path_hours"] == full["path_hours"]
+
+
+def test_graph_from_edges_matches_build_dependency_graph():
+    tasks = [
+        {"id": "A", "dependencies": []},
+        {"id": "B", "dependencies": ["A", "ghost"]},
+        {"id": "C", "dependencies": ["A", "B"]},
+    ]
+    edges = [(t["id"], dep) for t in tasks for dep in t["dependencies"]]
+
+    assert graph_from_edges([t["id"] for t in tasks], edges) == build_dependency_graph(tasks)
+
+
+def test_critical_mode_scores_only_tasks_that_block_something():
+    tasks = [
+        {"id": "A", "dependencies": []},
+        {"id": "B", "dependencies": ["A"]},
+        {"id": "C", "dependencies": []},
+    ]
+    graph = build_dependency_graph(tasks)
+
+    critical = dependency_inputs(graph, "critical", {"A": 2, "B": 3, "C": 40})
+
+    assert critical["dependent_counts"] == {"A": 5, "B": 0, "C": 0}
+    assert critical["slack"] == {"A": 35, "B": 35, "C": 0}
+    assert critical["dependency_mode"] == "critical"
+
+    components = {"urgency": 0.0, "importance": 0.0, "effort": 0.5, "dependency": 1.0}
+    assert build_explanation(components, "critical") == "On or near the critical path."
+    assert build_explanation(components) == "Blocks many other tasks."
+
+    batch = score_batch(
+        [None] * 3, [5] * 3, [2] * 3, [5, 0, 3], date(2024, 1, 1),
+        {"urgency": 0.25, "importance": 0.25, "effort": 0.25, "dependency": 0.25},
+        5, dependency_mode="critical"
+    )
+    assert batch["explanation"] == [
+        build_explanation(
+            {"urgency": 0.1, "importance": 4 / 9, "effort": 0.75, "dependency": d},
+            "critical"
+        )
+        for d in (1.0, 0.0, 0.6)
+    ]
+
+
+def test_topological_order_rejects_cycles():
+    graph = build_dependency_graph([
+        {"id": "A", "dependencies": ["B"]},
+        {"id": "B", "dependencies": ["A"]},
+    ])
+    with pytest.raises(ValueError):
+        topological_order(graph)
+
+
+def test_schedule_tasks_puts_blockers_first_by_score():
+    tasks = [
+        {"id": "A", "score": 0.9, "estimated_hours": 4, "dependencies": ["C"]},
+        {"id": "B", "score": 0.5, "estimated_hours": 6, "dependencies": []},
+        {"id": "C", "score": 0.1, "estimated_hours": 3, "dependencies": ["ghost"]},
+        {"id": "D", "score": 0.7, "estimated_hours": 10, "dependencies": []},
+    ]
+    graph = build_dependency_graph(tasks)
+
+    schedule = schedule_tasks(tasks, graph)
+    assert [entry.task["id"] for entry in schedule] == ["D", "B", "C", "A"]
+    assert schedule[0].start_date is None
+
+    # from Fri 2024-01-05: D runs over into Monday, B fills the rest of it
+    schedule = schedule_tasks(tasks, graph, "2024-01-04", capacity_hours=8)
+    assert [(e.start_date, e.end_date) for e in schedule] == [
+        (date(2024, 1, 5), date(2024, 1, 8)),
+        (date(2024, 1, 8), date(2024, 1, 8)),
+        (date(2024, 1, 9), date(2024, 1, 9)),
+        (date(2024, 1, 9), date(2024, 1, 9)),
+    ]
+
+
+def test_schedule_tasks_spans_long_tasks_in_one_step():
+    tasks = [{"id": "A", "score": 1, "estimated_hours": 10 ** 6, "dependencies": []}]
+    graph = build_dependency_graph(tasks)
+
+    [entry] = schedule_tasks(tasks, graph, "2024-01-05", capacity_hours=8)
+    assert count_working_days(entry.start_date, entry.end_date) == 10 ** 6 // 8 - 1
+
+    with pytest.raises(OverflowError):
+        schedule_tasks(tasks, graph, "2024-01-05", capacity_hours=0.001)
+
+
+def test_add_working_days_inverts_count_working_days():
+    start = date(2024, 1, 3)  # Wednesday
+    for days in range(30):
+        end = add_working_days(start, days)
+        assert count_working_days(start, end) == days
+        assert days == 0 or count_working_days(start, end - timedelta(days=1)) == days - 1
+
+
+def test_urgency_table_matches_compute_urgency():
+    calendar = HolidayCalendar([date(2024, 1, 15), date(2024, 2, 19)])
+    today = date(2024, 1, 5)
+    table = UrgencyTable("2024-01-05", calendar=calendar)
+
+    assert table(None) == compute_urgency(None, today)
+    for offset in range(-10, 80):
+        due = today + timedelta(days=offset)
+        assert table(due) == compute_urgency(due, today, calendar=calendar)
+    assert table("2024-01-22") == compute_urgency("2024-01-22", "2024-01-05", calendar=calendar)
@@ -0,0 +1,96 @@
+import json
+import random
+
+import pytest
+from rest_framework.exceptions import ValidationError
+
+from .serializers import TaskSerializer
+from .validators import validate_tasks
+
+
+VALID_TASK = {
+    "id": "T1",
+    "title": "Write report",
+    "due_date": "2024-01-15",
+    "estimated_hours": 3,
+    "importance": 7,
+    "dependencies": ["T0"],
+}
+
+# Field values the serializer accepts or rejects in different ways
+FIELD_VARIANTS = {
+    "id": ["T1", 17, 1.5, "  padded  ", "", "   ", None, True, [], {}, "nul\x00", "\ud800"],
+    "title": ["Write", "", " ", None, 3, False, ["x"], "ünïcode"],
+    "due_date": ["2024-01-15", "2024-02-30", "15/01/2024", "20240115", "", None, 20240115, "2024-01-15T10:00"],
+    "estimated_hours": [0, 3, -1, 2.0, 2.5, "4", "4.0", "x", "", None, True, 10 ** 30, "9" * 1001],
+    "importance": [1, 10, 0, 11, "7", 7.0, None, [], False],
+    "dependencies": [[], ["A", 2], "A", {"a": 1}, None, ["", None, "ok", []], ("A",), 5],
+}
+
+
+def _serializer_result(data):
+    serializer = TaskSerializer(data=data, many=True)
+    if serializer.is_valid():
+        return "valid", [dict(task) for task in serializer.validated_data]
+    return "invalid", serializer.errors
+
+
+def _fast_result(data):
+    try:
+        return "valid", [dict(task) for task in validate_tasks(data)]
+    except ValidationError as exc:
+        return "invalid", exc.detail
+
+
+def _assert_parity(data):
+    expected = _serializer_result(data)
+    actual = _fast_result(data)
+
+    assert actual == expected
+    # same messages, codes and key order once rendered
+    assert json.dumps(actual[1], default=str) == json.dumps(expected[1], default=str)
+    if expected[0] == "invalid":
+        assert repr(actual[1]) == repr(expected[1])
+
+
+def test_valid_batch_matches_serializer():
+    tasks = [dict(VALID_TASK, id=f"T{i}") for i in range(50)]
+    _assert_parity(tasks)
+
+
+@pytest.mark.parametrize("field", sorted(FIELD_VARIANTS))
+def test_field_errors_match_serializer(field):
+    for value in FIELD_VARIANTS[field]:
+        _assert_parity([VALID_TASK, dict(VALID_TASK, **{field: value})])
+
+
+@pytest.mark.parametrize("field", sorted(FIELD_VARIANTS))
+def test_missing_field_matches_serializer(field):
+    task = dict(VALID_TASK)
+    del task[field]
+    _assert_parity([task, VALID_TASK])
+
+
+@pytest.mark.parametrize("data", [
+    None, {}, "tasks", 5, {"tasks": []}, [],
+    [None], [1], ["x"], [[]], [VALID_TASK, None],
+])
+def test_top_level_shapes_match_serializer(data):
+    _assert_parity(data)
+
+
+def test_random_batches_match_serializer():
+    rng = random.Random(12)
+
+    for _ in range(200):
+        batch = []
+        for _ in range(rng.randint(0, 6)):
+            task = dict(VALID_TASK)
+            for field, variants in FIELD_VARIANTS.items():
+                roll = rng.random()
+                if roll < 0.15:
+                    task[field] = rng.choice(variants)
+                elif roll < 0.18:
+                    del task[field]
+            batch.append(task)
+        _assert_parity(batch)
@@ -0,0 +1,86 @@
+from django.test import override_settings
+
+
+def test_local_weights_are_reread_after_ttl(api_client):
+    # the default LocMemCache is process-local: no shared version counter
+    from taskapp import weights
+    from taskapp.models import GlobalSettings
+
+    weights.get_global_settings()
+    with override_settings(WEIGHTS_LOCAL_TTL=3600):
+        assert weights._shared_cache() is None
+        before = weights.get_weights()
+
+        # another worker folds feedback into the row
+        GlobalSettings.objects.update(weight_urgency=0.7)
+        assert weights.get_weights() == before
+
+    with override_settings(WEIGHTS_LOCAL_TTL=0):
+        assert weights.get_weights()["urgency"] == 0.7
+        GlobalSettings.objects.update(weight_urgency=before["urgency"])
+
+
+def test_shared_version_replaces_a_stale_copy_without_a_db_read(api_client, tmp_path):
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from taskapp import weights
+
+    file_cache = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    saved = dict(weights._local)
+    try:
+        with override_settings(CACHES=file_cache):
+            assert weights._shared_cache() is not None
+            before = weights.get_weights()
+            version = caches["default"].get(weights.VERSION_KEY)
+            assert weights._local["version"] == version
+
+            # this process's copy is current: no DB read
+            with CaptureQueriesContext(connection) as queries:
+                assert weights.get_weights() == before
+            assert len(queries) == 0
+
+            # another worker folds feedback and publishes the result
+            published = dict(before, urgency=0.7, importance=before["importance"] - 0.3)
+            weights.publish_weights(published)
+            assert caches["default"].get(weights.VERSION_KEY) == version + 1
+
+            # ...while this one still holds the old version
+            weights._local.update(version=version, weights=before)
+            with CaptureQueriesContext(connection) as queries:
+                assert weights.get_weights() == published
+            assert len(queries) == 0
+            assert weights._local["version"] == version + 1
+    finally:
+        weights._local.update(saved)
+
+
+def test_reduce_feedback_folds_rows_that_commit_out_of_id_order(api_client):
+    from taskapp import weights
+    from taskapp.models import Feedback, GlobalSettings
+
+    weights.reduce_feedback()  # fold whatever earlier tests logged
+    GlobalSettings.objects.update(
+        weight_urgency=0.4, weight_importance=0.3, weight_effort=0.2, weight_dependency=0.1
+    )
+
+    row = {"urgency": 0.9, "importance": 0.2, "effort": 0.5, "dependency": 0.0}
+    _, late, _ = (Feedback.objects.create(task_id=t, was_helpful=True, **row) for t in "abc")
+    late_id = late.id
+    late.delete()  # not committed yet when the reducer runs
+
+    version = GlobalSettings.objects.get().weights_version
+    once = weights.reduce_feedback()
+    assert GlobalSettings.objects.get().weights_version == version + 1
+
+    Feedback.objects.create(id=late_id, task_id="b", was_helpful=False, **row)
+    twice = weights.reduce_feedback()
+
+    assert twice != once
+    assert not Feedback.objects.filter(folded=False).exists()
+    assert weights.reduce_feedback() is None
@@ -1,8 +1,16 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('analyze/', views.analyze_placeholder),
+    path('analyze/<uuid:session_id>/', views.session_detail),
     path('suggest/', views.suggest_placeholder),
     path("feedback/", views.submit_feedback),
+    path("feedback/batch/", views.submit_feedback_batch),
+    path("metrics/", views.metrics_view),
+
+    # native async variants for ASGI deployments
+    path('async/analyze/', async_views.analyze_async),
+    path('async/suggest/', async_views.suggest_async),
+    path("async/feedback/", async_views.feedback_async),
 ]
@@ -0,0 +1,148 @@
+from functools import lru_cache
+
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+from .serializers import TaskSerializer
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_date(value):
+    """
+    Memoized ISO date parsing (most tasks in a batch share a handful
+    of due dates). None means "not a valid date".
+    """
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+_INT_LIMIT = 2 ** 63
+
+
+def _clean_str(value):
+    # Common case of a CharField(allow_blank=False): a plain ASCII string
+    # without NUL characters; anything else goes through DRF.
+    if type(value) is str and value.isascii() and "\x00" not in value:
+        value = value.strip()
+        if value:
+            return value
+    elif type(value) is int:
+        return str(value)
+    return None
+
+
+class FastTaskValidator:
+    """
+    Compiled equivalent of TaskSerializer(many=True) for large batches.
+
+    Each field of each task is checked with plain type tests in one
+    loop. Any task the fast checks cannot accept outright is handed to
+    the real serializer, so validated data and errors (shape, messages
+    and codes) are exactly what TaskSerializer produces.
+    """
+
+    def __init__(self, serializer_class=TaskSerializer, task_factory=dict):
+        self.serializer_class = serializer_class
+        self.task_factory = task_factory
+        self.child = serializer_class()
+
+        fields = self.child.fields
+        self.hours_min = fields["estimated_hours"].min_value
+        self.hours_max = fields["estimated_hours"].max_value
+        self.importance_min = fields["importance"].min_value
+        self.importance_max = fields["importance"].max_value
+
+    def _in_range(self, value, low, high):
+        # huge ints go through DRF (str() of them can fail there)
+        return (
+            type(value) is int
+            and -_INT_LIMIT < value < _INT_LIMIT
+            and (low is None or value >= low)
+            and (high is None or value <= high)
+        )
+
+    def _fast_item(self, item):
+        """
+        Validated dict for a task that passes every fast check, else None.
+        """
+        if type(item) is not dict:
+            return None
+
+        task_id = _clean_str(item.get("id"))
+        title = _clean_str(item.get("title"))
+        if task_id is None or title is None:
+            return None
+
+        due_date = item.get("due_date")
+        if type(due_date) is not str:
+            return None
+        due_date = _parse_iso_date(due_date)
+        if due_date is None:
+            return None
+
+        hours = item.get("estimated_hours")
+        if not self._in_range(hours, self.hours_min, self.hours_max):
+            return None
+
+        importance = item.get("importance")
+        if not self._in_range(importance, self.importance_min, self.importance_max):
+            return None
+
+        dependencies = item.get("dependencies")
+        if type(dependencies) is not list:
+            return None
+        cleaned = [_clean_str(dep) for dep in dependencies]
+        if None in cleaned:
+            return None
+
+        return self.task_factory(
+            id=task_id,
+            title=title,
+            due_date=due_date,
+            estimated_hours=hours,
+            importance=importance,
+            dependencies=cleaned
+        )
+
+    def validate(self, data):
+        """
+        Return the list of validated tasks or raise the same
+        ValidationError as TaskSerializer(data=data, many=True).
+        """
+        if type(data) is not list:
+            # not a list of items at all → let DRF word the error
+            serializer = self.serializer_class(data=data, many=True)
+            serializer.is_valid(raise_exception=True)
+            return [self.task_factory(**task) for task in serializer.validated_data]
+
+        validated = []
+        errors = {}
+
+        for index, item in enumerate(data):
+            task = self._fast_item(item)
+            if task is None:
+                try:
+                    task = self.task_factory(**self.child.run_validation(item))
+                except ValidationError as exc:
+                    errors[index] = exc.detail
+                    continue
+            validated.append(task)
+
+        if errors:
+            if not getattr(api_settings, "LIST_SERIALIZER_ERRORS_AS_DICT", False):
+                errors = [errors.get(index, {}) for index in range(len(data))]
+            raise ValidationError(errors)
+
+        return validated
+
+
+def validate_tasks(data, task_factory=dict):
+    """
+    Fast-path replacement for TaskSerializer(data=data, many=True) +
+    is_valid(raise_exception=True) + validated_data. Each validated task
+    is built with task_factory(**fields) (a dict by default).
+    """
+    return FastTaskValidator(task_factory=task_factory).validate(data)
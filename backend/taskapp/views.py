@@ -1,124 +1,669 @@
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from django.conf import settings as django_settings
+from django.http import StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.utils.http import parse_etags
+from collections import Counter
+from datetime import date
+from itertools import islice
 import uuid
 
-from .serializers import TaskSerializer
-from .models import AnalyzedTask, GlobalSettings, Feedback
+from .instrumentation import metrics, stage, timed, timing_enabled
+from .parsers import NDJSONParser
+from .serializers import FeedbackSerializer, TaskSerializer
+from .validators import validate_tasks
+from .models import AnalysisSession, AnalyzedTask, Feedback
+from .persistence import (
+    latest_components,
+    load_session_tasks,
+    save_session,
+    save_session_async,
+    session_graph,
+    suggestions_from_rows,
+    update_session
+)
+from .weights import get_weights, request_flush
 
 from scoring import (
+    BATCH_SCORING_AVAILABLE,
+    ScoreMemo,
+    TaskRecord,
+    UrgencyTable,
     build_explanation,
     compute_final_score,
+    score_batch,
+    score_parallel,
     build_dependency_graph,
-    detect_cycle
+    apply_graph_diff,
+    cycle_path,
+    dependency_inputs,
+    DEPENDENCY_MODES,
+    find_cycles,
+    rank_tasks,
+    schedule_tasks
 )
 
 
+def _non_negative_int(value, name, default=None):
+    """
+    Parse an optional non-negative integer request parameter.
+    """
+    if value is None or value == "":
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: ["A valid integer is required."]})
+    if value < 0:
+        raise ValidationError({name: ["Ensure this value is greater than or equal to 0."]})
+    return value
+
+
+def _today(value, default=None):
+    """
+    Parse the optional today option once per request (YYYY-MM-DD);
+    defaults to `default`, else the server's current date.
+    """
+    if value is None or value == "":
+        return default or date.today()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValidationError({"today": ["Date has wrong format. Use YYYY-MM-DD."]})
+
+def _make_score_memo():
+    size = getattr(django_settings, "SCORE_MEMO_SIZE", 100000)
+    if not size:
+        return None
+    return ScoreMemo(max_entries=size, ttl=getattr(django_settings, "SCORE_MEMO_TTL", 3600))
+
+
+# Scoring results of earlier requests, reused for unchanged tasks
+score_memo = _make_score_memo()
+
+
+def _score_tasks(tasks, today, dep_graph, weights, memo=None):
+    """
+    Score TaskRecords in place and render their explanations; large
+    batches take the vectorized path (same results as the per-task loop).
+    Smaller batches skip tasks whose scoring inputs are in the memo; the
+    vectorized path is cheaper than the memo lookups, so it never uses it.
+    """
+    if memo is None:
+        memo = score_memo
+    counts = dep_graph["dependent_counts"]
+    max_dependents = dep_graph["max_dependents"]
+    mode = dep_graph.get("dependency_mode", "direct")
+
+    batch_threshold = getattr(django_settings, "ANALYZE_BATCH_SCORING_THRESHOLD", 500)
+    vectorized = BATCH_SCORING_AVAILABLE and len(tasks) >= batch_threshold
+
+    if memo is None or vectorized:
+        keys = None
+        pending = tasks
+    else:
+        keys = []
+        pending = []
+        for task in tasks:
+            key = memo.memo_key(task, today, weights, counts.get(task.id, 0), max_dependents, mode)
+            cached = memo.get(key)
+            if cached is None:
+                keys.append(key)
+                pending.append(task)
+            else:
+                task.set_score(*cached)
+
+    if vectorized:
+        batch = score_batch(
+            [task.due_date for task in pending],
+            [task.importance for task in pending],
+            [task.estimated_hours for task in pending],
+            [counts.get(task.id, 0) for task in pending],
+            today,
+            weights,
+            max_dependents,
+            dependency_mode=mode
+        )
+        for task, score, U, I, E, D, explanation in zip(
+            pending,
+            batch["score"].tolist(),
+            batch["urgency"].tolist(),
+            batch["importance"].tolist(),
+            batch["effort"].tolist(),
+            batch["dependency"].tolist(),
+            batch["explanation"]
+        ):
+            task.set_score(score, U, I, E, D, explanation)
+    elif pending:
+        # today parsed and urgency tabulated once for the whole batch
+        urgency = UrgencyTable(today)
+        for task in pending:
+            result = compute_final_score(task, today, dep_graph, weights, urgency)
+            components = result["components"]
+            task.set_score(
+                result["score"],
+                components["urgency"],
+                components["importance"],
+                components["effort"],
+                components["dependency"],
+                build_explanation(components, mode)
+            )
+
+    if keys is not None:
+        for key, task in zip(keys, pending):
+            memo.put(key, (
+                task.score,
+                task.urgency,
+                task.importance_score,
+                task.effort,
+                task.dependency,
+                task.explanation
+            ))
+
+    return tasks
+
+
+def _cycle_payload(dep_graph, cycles):
+    return {
+        "error": "Circular dependency detected",
+        "cycle": cycle_path(dep_graph, cycles[0]),
+        "cycles": cycles
+    }
+
+
+def _cycle_error(dep_graph, cycles):
+    return Response(
+        _cycle_payload(dep_graph, cycles),
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
 
 # ANALYZE ENDPOINT
 
 
+# Static profiles
+WEIGHT_PROFILES = {
+    "smart":     {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1},
+    "fast":      {"urgency": 0.0, "importance": 0.0, "effort": 1.0, "dependency": 0.0},
+    "impact":    {"urgency": 0.0, "importance": 1.0, "effort": 0.0, "dependency": 0.0},
+    "deadline":  {"urgency": 1.0, "importance": 0.0, "effort": 0.0, "dependency": 0.0},
+}
+
+# Strategies scored with a static profile; anything else uses learned weights
+STATIC_STRATEGIES = ["fast", "impact", "deadline"]
+
+
+def _dependency_mode(value):
+    """
+    Parse the optional dependency_mode option (see scoring.DEPENDENCY_MODES).
+    """
+    mode = (value or "direct").lower()
+    if mode not in DEPENDENCY_MODES:
+        raise ValidationError({
+            "dependency_mode": [f"Expected one of: {', '.join(DEPENDENCY_MODES)}."]
+        })
+    return mode
+
+
+# "score": ranked by score, "schedule": execution order respecting dependencies
+ORDERS = ("score", "schedule")
+
+
+def _order_options(options):
+    """
+    Parse the optional order and capacity_hours (per working day) options.
+    """
+    order = (options.get("order") or "score").lower()
+    if order not in ORDERS:
+        raise ValidationError({"order": [f"Expected one of: {', '.join(ORDERS)}."]})
+
+    capacity_hours = options.get("capacity_hours")
+    if capacity_hours in (None, ""):
+        return order, None
+    try:
+        capacity_hours = float(capacity_hours)
+    except (TypeError, ValueError):
+        raise ValidationError({"capacity_hours": ["A valid number is required."]})
+    if not capacity_hours > 0:
+        raise ValidationError({"capacity_hours": ["Ensure this value is greater than 0."]})
+    return order, capacity_hours
+
+
+def _score_graph(dep_graph, mode, tasks):
+    # graph with the dependency inputs of `mode` (hours feed the critical
+    # path, whose slack is reported per task)
+    with stage("graph_metrics"):
+        graph = dependency_inputs(
+            dep_graph, mode, {task.id: task.estimated_hours for task in tasks}
+        )
+    slack = graph.get("slack")
+    if slack is not None:
+        for task in tasks:
+            task.slack = slack[task.id]
+    return graph
+
+
+def _validate_tasks(tasks_data):
+    """
+    TaskSerializer(many=True) validation into TaskRecords; large
+    batches take the compiled fast path (same validated data and errors).
+    """
+    threshold = getattr(django_settings, "FAST_VALIDATION_THRESHOLD", 1000)
+    if isinstance(tasks_data, list) and len(tasks_data) >= threshold:
+        return validate_tasks(tasks_data, task_factory=TaskRecord)
+
+    serializer = TaskSerializer(data=tasks_data, many=True)
+    serializer.is_valid(raise_exception=True)
+    return [TaskRecord(**task) for task in serializer.validated_data]
+
+
+def _validate_task_stream(items, chunk_size=1000):
+    """
+    Validate an iterator of tasks chunk by chunk, keeping only the
+    validated data. Errors are keyed by the task's position in the stream.
+    """
+    items = iter(items)
+    validated = []
+    errors = {}
+    start = 0
+
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            break
+
+        try:
+            validated.extend(_validate_tasks(chunk))
+        except ValidationError as exc:
+            chunk_errors = exc.detail
+            if isinstance(chunk_errors, dict):
+                chunk_errors = chunk_errors.items()
+            else:
+                chunk_errors = enumerate(chunk_errors)
+            for index, error in chunk_errors:
+                if error:
+                    errors[start + int(index)] = error
+
+        start += len(chunk)
+
+    if errors:
+        raise ValidationError(errors)
+
+    return validated
+
+
+def _score_and_rank(tasks, today, dep_graph, weights, limit=None, offset=0,
+                    order="score", capacity_hours=None):
+    """
+    Score TaskRecords in place and return (scored_tasks, ranked_tasks),
+    ranked_tasks being the requested page of the ranking, or of the
+    schedule (ScheduledTasks) when order is "schedule".
+    """
+    parallel_workers = getattr(django_settings, "ANALYZE_PARALLEL_WORKERS", 0)
+    parallel_threshold = getattr(django_settings, "ANALYZE_PARALLEL_THRESHOLD", 50000)
+    top = offset + limit if limit is not None else None
+
+    if (
+        parallel_workers > 0 and
+        BATCH_SCORING_AVAILABLE and
+        len(tasks) >= parallel_threshold
+    ):
+        # Very large batch: score shards in worker processes, merge top-K
+        with stage("score"):
+            ranked_tasks = score_parallel(
+                tasks, today, dep_graph, weights, parallel_workers,
+                top=0 if order == "schedule" else top
+            )[offset:]
+        scored_tasks = tasks
+    else:
+        # Score tasks
+        with stage("score"):
+            scored_tasks = _score_tasks(tasks, today, dep_graph, weights)
+        ranked_tasks = None
+
+    if order == "schedule":
+        # cycles were rejected before scoring
+        with stage("schedule"):
+            try:
+                schedule = schedule_tasks(scored_tasks, dep_graph, today, capacity_hours)
+            except OverflowError:
+                raise ValidationError({
+                    "capacity_hours": ["The schedule runs past the last supported date."]
+                })
+        return scored_tasks, schedule[offset:top]
+
+    if ranked_tasks is not None:
+        return scored_tasks, ranked_tasks
+
+    # Rank by score (highest → lowest); top-K heap when a limit is given
+    with stage("rank"):
+        ranked_tasks = rank_tasks(scored_tasks, limit, offset)
+    return scored_tasks, ranked_tasks
+
+
+def _ndjson_response(header, rows):
+    """
+    Stream a header line followed by one JSON line per TaskRecord.
+    """
+    encoder = JSONEncoder()
+
+    def lines():
+        yield encoder.encode(header) + "\n"
+        for row in rows:
+            yield encoder.encode(row.to_dict()) + "\n"
+
+    return StreamingHttpResponse(lines(), content_type=NDJSONParser.media_type)
+
+
+
+@timed("analyze")
 @api_view(['POST'])
+@parser_classes(api_settings.DEFAULT_PARSER_CLASSES + [NDJSONParser])
 def analyze_placeholder(request):
     """
     Analyze tasks, compute scores using either strategy weights
     or learned weights, and save the results in the DB.
+
+    With Content-Type application/x-ndjson the body is one task per
+    line (options go in the query string), parsed as it is read, and
+    the ranked rows are streamed back as NDJSON.
     """
 
-    tasks_data = request.data.get("tasks", [])
+    streaming = request.content_type.startswith(NDJSONParser.media_type)
+    options = request.query_params if streaming else request.data
+
+    # Optional page of the ranking to return
+    limit = _non_negative_int(options.get("limit"), "limit")
+    offset = _non_negative_int(options.get("offset"), "offset", default=0)
+
+    # How "blocks other tasks" is measured (direct dependents by default)
+    dependency_mode = _dependency_mode(options.get("dependency_mode"))
+
+    # Ranked by score, or scheduled in dependency order
+    order, capacity_hours = _order_options(options)
 
     # Validate structure
-    serializer = TaskSerializer(data=tasks_data, many=True)
-    serializer.is_valid(raise_exception=True)
-    validated_tasks = serializer.validated_data
+    with stage("validate"):
+        if streaming:
+            validated_tasks = _validate_task_stream(request.data)
+        else:
+            validated_tasks = _validate_tasks(request.data.get("tasks", []))
 
     # Build dependency graph
-    dep_graph = build_dependency_graph(validated_tasks)
+    with stage("graph"):
+        dep_graph = build_dependency_graph(validated_tasks)
 
-    # Check circular
-    cycle = detect_cycle(dep_graph)
-    if cycle:
-        return Response(
-            {"error": "Circular dependency detected", "cycle": cycle},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    # Check circular (report every cycle group, not just the first)
+    with stage("cycles"):
+        cycles = find_cycles(dep_graph)
+    if cycles:
+        return _cycle_error(dep_graph, cycles)
 
     # User-selected strategy
-    strategy = (request.data.get("strategy") or "smart").lower()
-
-    # Static profiles
-    WEIGHT_PROFILES = {
-        "smart":     {"urgency": 0.4, "importance": 0.3, "effort": 0.2, "dependency": 0.1},
-        "fast":      {"urgency": 0.0, "importance": 0.0, "effort": 1.0, "dependency": 0.0},
-        "impact":    {"urgency": 0.0, "importance": 1.0, "effort": 0.0, "dependency": 0.0},
-        "deadline":  {"urgency": 1.0, "importance": 0.0, "effort": 0.0, "dependency": 0.0},
-    }
+    strategy = (options.get("strategy") or "smart").lower()
 
     # Resolve weights 
-    if strategy in ["fast", "impact", "deadline"]:
+    if strategy in STATIC_STRATEGIES:
         weights = WEIGHT_PROFILES[strategy]
     else:
-        settings = GlobalSettings.objects.first()
-
-        if settings is None:
-            settings = GlobalSettings.objects.create(
-                weight_urgency=0.4,
-                weight_importance=0.3,
-                weight_effort=0.2,
-                weight_dependency=0.1
-            )
-
-        weights = {
-            "urgency": settings.weight_urgency,
-            "importance": settings.weight_importance,
-            "effort": settings.weight_effort,
-            "dependency": settings.weight_dependency
-        }
-
-    today = request.data.get("today")
-
-    # Score tasks
-    scored_tasks = []
-    for task in validated_tasks:
-        result = compute_final_score(task, today, dep_graph, weights)
-        explanation = build_explanation(result["components"])
-
-        scored_tasks.append({
-            "id": task.get("id"),
-            "title": task.get("title"),
-            "due_date": task.get("due_date"),
-            "estimated_hours": task.get("estimated_hours"),
-            "importance": task.get("importance"),
-            "dependencies": task.get("dependencies"),
-            "score": result["score"],
-            "components": result["components"],
-            "explanation": explanation
-        })
-    
-    # Sort by score (highest → lowest)
-    scored_tasks = sorted(scored_tasks, key=lambda x: x["score"], reverse=True)
+        # learned weights, cached per version (no DB read on the hot path)
+        with stage("weights"):
+            weights = get_weights()
+
+    today = _today(options.get("today"))
+
+    # Score and rank
+    scored_tasks, ranked_tasks = _score_and_rank(
+        validated_tasks,
+        today,
+        _score_graph(dep_graph, dependency_mode, validated_tasks),
+        weights,
+        limit,
+        offset,
+        order,
+        capacity_hours
+    )
 
 
     # Create session
     session_id = uuid.uuid4()
 
-    # Save results in DB
-    for st in scored_tasks:
-        AnalyzedTask.objects.create(
-            session_id=session_id,
-            task_id=st["id"],
-            title=st["title"],
-            score=st["score"],
-            urgency=st["components"]["urgency"],
-            importance=st["components"]["importance"],
-            effort=st["components"]["effort"],
-            dependency=st["components"]["dependency"],
-            due_date=st.get("due_date")
+    # Save results in DB (batched, one transaction)
+    batch_size = getattr(django_settings, "ANALYZE_PERSIST_BATCH_SIZE", 500)
+    snapshot_size = getattr(django_settings, "SUGGESTION_SNAPSHOT_SIZE", 10)
+    save = save_session_async if getattr(django_settings, "ANALYZE_PERSIST_ASYNC", False) else save_session
+    with stage("persist"):
+        save(
+            session_id,
+            scored_tasks,
+            strategy=strategy,
+            today=today,
+            weights=weights,
+            batch_size=batch_size,
+            snapshot_size=snapshot_size,
+            dependency_mode=dependency_mode
+        )
+
+    if streaming:
+        return _ndjson_response(
+            {"session_id": session_id, "total": len(scored_tasks)},
+            ranked_tasks
         )
 
     return Response({
         "session_id": session_id,
-        "tasks": scored_tasks
+        "total": len(scored_tasks),
+        "tasks": [task.to_dict() for task in ranked_tasks]
+    })
+
+
+
+# SAVED SESSION ENDPOINTS
+
+
+def _stored_session(session_id):
+    """
+    The session to re-analyze, or the error Response if it can't be.
+    """
+    session = AnalysisSession.objects.filter(session_id=session_id).first()
+    if session is None:
+        return None, Response({"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND)
+    if session.archived_at:
+        return None, Response(
+            {"error": "Session was archived by retention. Run /api/tasks/analyze/ again."},
+            status=status.HTTP_410_GONE
+        )
+    if not session.weights:
+        return None, Response(
+            {"error": "Session was saved without its task inputs. Run /api/tasks/analyze/ again."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return session, None
+
+
+@csrf_exempt
+def session_detail(request, session_id):
+    # POST re-runs a saved session with new options, PATCH applies a diff
+    if request.method == "POST":
+        return rerun_session(request, session_id)
+    return reanalyze_session(request, session_id)
+
+
+@timed("rerun")
+@api_view(['POST'])
+def rerun_session(request, session_id):
+    """
+    Analyze a saved session again from its stored tasks and edges, with
+    new options (today, strategy, dependency_mode, order, limit, ...) and
+    without re-uploading them. The session is rescored in place.
+    """
+
+    session, error = _stored_session(session_id)
+    if error:
+        return error
+
+    options = request.data
+    limit = _non_negative_int(options.get("limit"), "limit")
+    offset = _non_negative_int(options.get("offset"), "offset", default=0)
+    dependency_mode = _dependency_mode(
+        options.get("dependency_mode") or session.dependency_mode
+    )
+    order, capacity_hours = _order_options(options)
+
+    strategy = (options.get("strategy") or session.strategy or "smart").lower()
+    if strategy in STATIC_STRATEGIES:
+        weights = WEIGHT_PROFILES[strategy]
+    else:
+        with stage("weights"):
+            weights = get_weights()
+
+    today = _today(options.get("today"), session.today)
+
+    # Stored graph: acyclic when it was saved, no cycle check needed
+    with stage("load"):
+        tasks, row_ids = load_session_tasks(session_id)
+        dep_graph = session_graph(tasks)
+
+    scored_tasks, ranked_tasks = _score_and_rank(
+        list(tasks.values()),
+        today,
+        _score_graph(dep_graph, dependency_mode, tasks.values()),
+        weights,
+        limit,
+        offset,
+        order,
+        capacity_hours
+    )
+
+    session.strategy = strategy
+    session.today = today
+    session.weights = weights
+    session.dependency_mode = dependency_mode
+    with stage("persist"):
+        update_session(
+            session,
+            scored_tasks,
+            [],
+            row_ids,
+            task_count=len(tasks),
+            batch_size=getattr(django_settings, "ANALYZE_PERSIST_BATCH_SIZE", 500),
+            snapshot_size=getattr(django_settings, "SUGGESTION_SNAPSHOT_SIZE", 10),
+            changed_fields=["strategy", "today", "weights", "dependency_mode"]
+        )
+
+    return Response({
+        "session_id": session.session_id,
+        "total": len(scored_tasks),
+        "tasks": [task.to_dict() for task in ranked_tasks]
+    })
+
+
+@timed("reanalyze")
+@api_view(['PATCH'])
+def reanalyze_session(request, session_id):
+    """
+    Apply a diff (added / changed / removed tasks) to a saved session
+    and rescore only the tasks whose score can have changed.
+    """
+
+    session, error = _stored_session(session_id)
+    if error:
+        return error
+
+    # Validate the diff
+    added = TaskSerializer(data=request.data.get("added", []), many=True)
+    changed = TaskSerializer(data=request.data.get("changed", []), many=True)
+    errors = {}
+    if not added.is_valid():
+        errors["added"] = added.errors
+    if not changed.is_valid():
+        errors["changed"] = changed.errors
+    removed = request.data.get("removed", [])
+    if not isinstance(removed, list):
+        errors["removed"] = ["Expected a list of task ids."]
+    if errors:
+        raise ValidationError(errors)
+    removed = [str(tid) for tid in removed]
+
+    # Each task id may appear once in the whole diff
+    diff_ids = Counter(removed)
+    diff_ids.update(t["id"] for t in added.validated_data)
+    diff_ids.update(t["id"] for t in changed.validated_data)
+    repeated = [tid for tid, count in diff_ids.items() if count > 1]
+    if repeated:
+        raise ValidationError({"error": "Task ids appear more than once in the diff", "ids": repeated})
+
+    with stage("load"):
+        tasks, row_ids = load_session_tasks(session_id)
+
+    unknown = [tid for tid in removed if tid not in tasks]
+    unknown += [t["id"] for t in changed.validated_data if t["id"] not in tasks]
+    if unknown:
+        raise ValidationError({"error": "Unknown task ids for this session", "ids": unknown})
+    duplicate = [t["id"] for t in added.validated_data if t["id"] in tasks]
+    if duplicate:
+        raise ValidationError({"error": "Task ids already exist in this session", "ids": duplicate})
+
+    # Update the graph in place, check for cycles around the new edges only
+    upserts = [
+        TaskRecord(**task)
+        for task in list(added.validated_data) + list(changed.validated_data)
+    ]
+    with stage("graph"):
+        dep_graph = session_graph(tasks)
+        rescore_ids, new_edges = apply_graph_diff(dep_graph, upserts, removed)
+
+    with stage("cycles"):
+        cycles = find_cycles(dep_graph, roots={tid for tid, _ in new_edges})
+    if cycles:
+        return _cycle_error(dep_graph, cycles)
+
+    for tid in removed:
+        tasks.pop(tid)
+        row_ids.pop(tid)
+    for task in upserts:
+        tasks[task.id] = task
+    rescore_ids.update(task.id for task in upserts)
+
+    if session.dependency_mode != "direct":
+        # downstream metrics can move anywhere upstream of an edit
+        dep_graph = _score_graph(dep_graph, session.dependency_mode, tasks.values())
+        rescore_ids = set(tasks)
+
+    # Rescore the affected tasks with the session's own inputs
+    with stage("score"):
+        scored_tasks = _score_tasks(
+            [task for tid, task in tasks.items() if tid in rescore_ids],
+            session.today,
+            dep_graph,
+            session.weights
+        )
+
+    with stage("persist"):
+        update_session(
+            session,
+            scored_tasks,
+            removed,
+            row_ids,
+            task_count=len(tasks),
+            batch_size=getattr(django_settings, "ANALYZE_PERSIST_BATCH_SIZE", 500),
+            snapshot_size=getattr(django_settings, "SUGGESTION_SNAPSHOT_SIZE", 10),
+            edited_tasks=upserts
+        )
+
+    return Response({
+        "session_id": session.session_id,
+        "total": len(tasks),
+        "removed": removed,
+        "tasks": [task.to_dict() for task in rank_tasks(scored_tasks)]
     })
 
 
@@ -126,59 +671,88 @@ def analyze_placeholder(request):
 # SUGGEST ENDPOINT
 
 
+def _suggest_etag(session, limit):
+    return f'"{session.etag}-{limit}"' if session.etag else None
+
+
+def _etag_matches(request, etag):
+    if not etag:
+        return False
+    client_etags = parse_etags(request.headers.get("If-None-Match", ""))
+    return etag in client_etags or "*" in client_etags
+
+
+def _snapshot_covers(session, limit):
+    snapshot = session.suggestions
+    return limit <= len(snapshot) or len(snapshot) >= session.task_count
+
+
+@timed("suggest")
 @api_view(['GET'])
 def suggest_placeholder(request):
     """
-    Return top 3 tasks from latest session.
+    Return top tasks from latest session (3 unless ?limit= is given).
     """
 
-    latest_task = AnalyzedTask.objects.order_by('-created_at').first()
-    if not latest_task:
+    limit = _non_negative_int(request.query_params.get("limit"), "limit", default=3)
+
+    # Newest session (indexed on created_at) with its suggestion
+    # snapshot rendered at analyze time
+    latest_session = AnalysisSession.objects.order_by('-created_at').first()
+    if not latest_session:
         return Response(
             {"error": "No analyzed tasks found. Run /api/tasks/analyze/ first."},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    latest_session_id = latest_task.session_id
+    latest_session_id = latest_session.session_id
 
-    top_three = (
-        AnalyzedTask.objects
-        .filter(session_id=latest_session_id)
-        .order_by('-score')[:3]
-    )
-
-    suggestions = []
-    for t in top_three:
-        components = {
-            "urgency": t.urgency,
-            "importance": t.importance,
-            "effort": t.effort,
-            "dependency": t.dependency
-        }
+    # Cheap polling: nothing changed since the client's copy → 304
+    etag = _suggest_etag(latest_session, limit)
+    if _etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-        suggestions.append({
-            "id": t.task_id,
-            "title": t.title,
-            "score": t.score,
-            "due_date": t.due_date,
-            "why": build_explanation(components)
-        })
+    snapshot = latest_session.suggestions
+    if _snapshot_covers(latest_session, limit):
+        suggestions = snapshot[:limit]
+    else:
+        # Snapshot too short for this limit (or a session saved before
+        # snapshots existed): read straight from the (session_id, -score) index
+        suggestions = suggestions_from_rows(
+            latest_session_id, limit, latest_session.dependency_mode
+        )
 
-    return Response({
+    response = Response({
         "session_id": str(latest_session_id),
         "suggestions": suggestions
     })
-
+    if etag:
+        response["ETag"] = etag
+    return response
 
 
 # FEEDBACK ENDPOINT (LEARNING SYSTEM)
 
 
+def _feedback_result(weights):
+    if weights is None:
+        # folded later, or by a concurrent request: report the current weights
+        return {
+            "message": "Feedback saved. Weights will be updated on the next flush.",
+            "weights": get_weights()
+        }
+    return {
+        "message": "Feedback saved. Weights updated.",
+        "weights": weights
+    }
+
+
+@timed("feedback")
 @api_view(['POST'])
 def submit_feedback(request):
     """
     User marks a suggestion as helpful or not.
-    We update global weights accordingly.
+    The feedback is logged and folded into the global weights.
     """
 
     task_id = request.data.get("task_id")
@@ -195,63 +769,85 @@ def submit_feedback(request):
     if not analyzed:
         return Response({"error": "Task not found in analysis history"}, status=404)
 
-    # Save feedback
+    # Append to the feedback log with the components it refers to
     Feedback.objects.create(
         task_id=task_id,
-        was_helpful=bool(was_helpful)
+        was_helpful=bool(was_helpful),
+        urgency=analyzed.urgency,
+        importance=analyzed.importance,
+        effort=analyzed.effort,
+        dependency=analyzed.dependency
     )
 
-    # Get or init weight settings
-    settings = GlobalSettings.objects.first()
-    if not settings:
-        settings = GlobalSettings.objects.create(
-            weight_urgency=0.4,
-            weight_importance=0.3,
-            weight_effort=0.2,
-            weight_dependency=0.1
+    # Fold the log into the weights now (or on the next background flush)
+    return Response(_feedback_result(request_flush()))
+
+
+@timed("feedback_batch")
+@api_view(['POST'])
+def submit_feedback_batch(request):
+    """
+    Many feedback items at once: {"feedback": [{"task_id", "was_helpful"}, ...]}.
+    All task ids are resolved with one query, the items are logged in
+    order and folded into the weights in one step (same result as
+    posting them one by one).
+    """
+
+    feedback = request.data.get("feedback", [])
+
+    # Size cap before any per-item validation work
+    max_items = getattr(django_settings, "FEEDBACK_BATCH_MAX_ITEMS", 1000)
+    if isinstance(feedback, list) and len(feedback) > max_items:
+        raise ValidationError({"feedback": [f"Ensure this list has at most {max_items} items."]})
+
+    serializer = FeedbackSerializer(data=feedback, many=True)
+    serializer.is_valid(raise_exception=True)
+    items = serializer.validated_data
+
+    # Latest analyzed values of every task in the batch
+    components = latest_components(item["task_id"] for item in items)
+    missing = sorted({item["task_id"] for item in items} - components.keys())
+    if missing:
+        return Response(
+            {"error": "Task not found in analysis history", "ids": missing},
+            status=404
         )
 
-    lr = 0.05  # learning rate
+    # Append to the feedback log in request order
+    rows = []
+    for item in items:
+        U, I, E, D = components[item["task_id"]]
+        rows.append(Feedback(
+            task_id=item["task_id"],
+            was_helpful=item["was_helpful"],
+            urgency=U,
+            importance=I,
+            effort=E,
+            dependency=D
+        ))
+    Feedback.objects.bulk_create(rows)
+
+    result = _feedback_result(request_flush())
+    result["count"] = len(items)
+    return Response(result)
 
-    # Extract actual component scores
-    U = analyzed.urgency
-    I = analyzed.importance
-    E = analyzed.effort
-    D = analyzed.dependency
 
-    # Update weights
-    if was_helpful:
-        settings.weight_urgency += lr * U
-        settings.weight_importance += lr * I
-        settings.weight_effort += lr * E
-        settings.weight_dependency += lr * D
-    else:
-        settings.weight_urgency -= lr * U
-        settings.weight_importance -= lr * I
-        settings.weight_effort -= lr * E
-        settings.weight_dependency -= lr * D
-
-    # Normalize to sum to 1
-    S = (
-        settings.weight_urgency +
-        settings.weight_importance +
-        settings.weight_effort +
-        settings.weight_dependency
-    )
 
-    settings.weight_urgency /= S
-    settings.weight_importance /= S
-    settings.weight_effort /= S
-    settings.weight_dependency /= S
+# METRICS ENDPOINT
 
-    settings.save()
+
+@api_view(['GET'])
+def metrics_view(request):
+    """
+    Per-stage timing histograms of this process (REQUEST_TIMING_ENABLED),
+    plus score memo counters. Local requests only.
+    """
+    if not timing_enabled():
+        return Response({"error": "Request timing is disabled"}, status=status.HTTP_404_NOT_FOUND)
+    if request.META.get("REMOTE_ADDR") not in ("127.0.0.1", "::1"):
+        return Response(status=status.HTTP_403_FORBIDDEN)
 
     return Response({
-        "message": "Feedback saved. Weights updated.",
-        "weights": {
-            "urgency": settings.weight_urgency,
-            "importance": settings.weight_importance,
-            "effort": settings.weight_effort,
-            "dependency": settings.weight_dependency
-        }
+        "timing": metrics(),
+        "score_memo": score_memo.stats() if score_memo else None
     })
@@ -0,0 +1,234 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Feedback, GlobalSettings
+
+from scoring import fold_feedback_batch
+
+
+VERSION_KEY = "taskapp:weights:version"
+WEIGHTS_KEY = "taskapp:weights:{}"
+
+# This process's copy of the learned weights, the shared version it
+# belongs to and when it was read (for the in-process fallback)
+_local = {"version": None, "weights": None, "loaded_at": None}
+_lock = threading.Lock()
+
+# Pending background flush of the feedback log (one per process)
+_flush = {"timer": None}
+
+
+def _shared_cache():
+    """
+    Django cache used to share the version counter between workers, or
+    None if there is none: no alias, or a process-local backend (each
+    worker's LocMemCache would keep a counter of its own).
+    """
+    alias = getattr(settings, "WEIGHTS_CACHE_ALIAS", "default")
+    if not alias:
+        return None
+    cache = caches[alias]
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        return None
+    return cache
+
+
+def get_global_settings():
+    """
+    Return the weight settings row, creating it with defaults if needed.
+    """
+    obj = GlobalSettings.objects.first()
+    if obj is None:
+        obj = GlobalSettings.objects.create(
+            weight_urgency=0.4,
+            weight_importance=0.3,
+            weight_effort=0.2,
+            weight_dependency=0.1
+        )
+    return obj
+
+
+def weights_of(obj):
+    return {
+        "urgency": obj.weight_urgency,
+        "importance": obj.weight_importance,
+        "effort": obj.weight_effort,
+        "dependency": obj.weight_dependency
+    }
+
+
+def get_weights():
+    """
+    Learned weights for scoring. Served from memory while the shared
+    version counter is unchanged; the DB is only read after a version
+    bump that no other worker has cached yet.
+
+    Without a shared cache other workers' updates can't be seen, so the
+    in-process copy is re-read from the DB once it is older than
+    WEIGHTS_LOCAL_TTL seconds (0: on every call).
+    """
+    cache = _shared_cache()
+
+    if cache is None:
+        ttl = getattr(settings, "WEIGHTS_LOCAL_TTL", 5)
+        with _lock:
+            if (
+                _local["weights"] is not None and
+                time.monotonic() - _local["loaded_at"] < ttl
+            ):
+                return dict(_local["weights"])
+
+        weights = weights_of(get_global_settings())
+        with _lock:
+            _local["weights"] = weights
+            _local["loaded_at"] = time.monotonic()
+        return dict(weights)
+
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # first use or cache flushed: start a fresh counter at a random
+        # base so no worker mistakes its old copy for the current one
+        cache.add(VERSION_KEY, random.getrandbits(48), None)
+        version = cache.get(VERSION_KEY)
+
+    # version and weights are replaced together under the lock
+    with _lock:
+        if version == _local["version"]:
+            return dict(_local["weights"])
+
+    key = WEIGHTS_KEY.format(version)
+    weights = cache.get(key)
+    if weights is None:
+        weights = weights_of(get_global_settings())
+        cache.set(key, weights, getattr(settings, "WEIGHTS_CACHE_TIMEOUT", None))
+
+    with _lock:
+        _local["version"] = version
+        _local["weights"] = weights
+
+    return dict(weights)
+
+
+def publish_weights(weights):
+    """
+    Called after the weights were saved: bump the version so every
+    worker picks up the new values, and prime the cache with them.
+    """
+    cache = _shared_cache()
+
+    if cache is None:
+        # only this process sees it now; others within WEIGHTS_LOCAL_TTL
+        with _lock:
+            _local["weights"] = dict(weights)
+            _local["loaded_at"] = time.monotonic()
+        return
+
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, random.getrandbits(48), None)
+        version = cache.get(VERSION_KEY)
+
+    cache.set(
+        WEIGHTS_KEY.format(version),
+        dict(weights),
+        getattr(settings, "WEIGHTS_CACHE_TIMEOUT", None)
+    )
+
+    with _lock:
+        _local["version"] = version
+        _local["weights"] = dict(weights)
+
+
+# Feedback log reducer
+
+
+def reduce_feedback(max_attempts=5, chunk_size=500):
+    """
+    Fold the feedback rows not folded yet into the learned weights: one
+    query for the pending log, then one transaction with a conditional
+    UPDATE of the settings row, which only applies if no other reducer
+    bumped weights_version meanwhile (the loser re-reads and retries),
+    and the UPDATE marking exactly those rows folded.
+
+    Rows are tracked one by one rather than by an id watermark, so a
+    row that commits after a higher id was folded (concurrent inserts)
+    is picked up by the next fold instead of being skipped. Returns the
+    new weights, or None if there was nothing to fold.
+    """
+    for _ in range(max_attempts):
+        obj = get_global_settings()
+        version = obj.weights_version
+
+        log = list(
+            Feedback.objects
+            .filter(folded=False)
+            .order_by("id")
+            .values_list("id", "was_helpful", "urgency", "importance", "effort", "dependency")
+        )
+        if not log:
+            return None
+
+        weights = fold_feedback_batch(weights_of(obj), (row[1:] for row in log))
+
+        with transaction.atomic():
+            updated = GlobalSettings.objects.filter(pk=obj.pk, weights_version=version).update(
+                weight_urgency=weights["urgency"],
+                weight_importance=weights["importance"],
+                weight_effort=weights["effort"],
+                weight_dependency=weights["dependency"],
+                weights_version=version + 1,
+                updated_at=timezone.now()
+            )
+            if updated:
+                ids = [row[0] for row in log]
+                for start in range(0, len(ids), chunk_size):
+                    Feedback.objects.filter(
+                        id__in=ids[start:start + chunk_size]
+                    ).update(folded=True)
+
+        if updated:
+            publish_weights(weights)
+            return weights
+
+    return None
+
+
+def _flush_in_background():
+    with _lock:
+        _flush["timer"] = None
+    try:
+        reduce_feedback()
+    finally:
+        # timer thread owns its connection
+        connection.close()
+
+
+def request_flush():
+    """
+    Called after feedback was logged. With FEEDBACK_FLUSH_INTERVAL = 0
+    the log is folded right away and the new weights are returned;
+    otherwise a background flush is scheduled within the interval (one
+    pending per process, so a burst of feedback is folded in one go)
+    and None is returned.
+    """
+    interval = getattr(settings, "FEEDBACK_FLUSH_INTERVAL", 0)
+    if not interval:
+        return reduce_feedback()
+
+    with _lock:
+        if _flush["timer"] is None:
+            timer = threading.Timer(interval, _flush_in_background)
+            timer.daemon = True
+            _flush["timer"] = timer
+            timer.start()
+
+    return None